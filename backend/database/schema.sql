@@ -122,6 +122,7 @@ CREATE TABLE IF NOT EXISTS model_versions (
     -- Model info
     hyperparameters JSONB,  -- Serialized hyperparameters
     feature_list JSONB,  -- List of features used
+    feature_reference JSONB,  -- Training-time feature/prediction histograms for drift monitoring
     model_path VARCHAR(500),  -- Path to saved model file
 
     -- Performance tracking
@@ -152,6 +153,68 @@ CREATE TABLE IF NOT EXISTS model_predictions (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Table: signal_features
+-- Precomputed ML features, one row per signal (feature store)
+CREATE TABLE IF NOT EXISTS signal_features (
+    signal_id INTEGER PRIMARY KEY REFERENCES signal_logs(id),
+    ground_truth_id INTEGER REFERENCES signal_ground_truth(id),
+    game_id VARCHAR(100),
+    signal_timestamp TIMESTAMP NOT NULL,
+
+    -- Features (same order as MLService.features)
+    rigging_index DECIMAL(5,4) NOT NULL,
+    anomaly_score DECIMAL(5,4) NOT NULL,
+    tweet_count INTEGER NOT NULL,
+    avg_sentiment DECIMAL(5,4) NOT NULL,
+    hour_of_day SMALLINT NOT NULL,
+    day_of_week SMALLINT NOT NULL,
+
+    label BOOLEAN,  -- Synced from signal_ground_truth.manual_label, NULL: unlabeled
+
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table: feature_store_state
+-- Feature store sync watermarks ('label_sync': signal_ground_truth.created_at)
+CREATE TABLE IF NOT EXISTS feature_store_state (
+    key VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Columns added to existing deployments
+ALTER TABLE model_versions ADD COLUMN IF NOT EXISTS feature_reference JSONB;
+
+-- Table: labeling_queue
+-- Unlabeled ground-truth rows ranked by model uncertainty for validators
+CREATE TABLE IF NOT EXISTS labeling_queue (
+    ground_truth_id INTEGER PRIMARY KEY REFERENCES signal_ground_truth(id) ON DELETE CASCADE,
+    signal_id INTEGER,
+    game_id VARCHAR(100),
+
+    probability_rigged DECIMAL(6,5) NOT NULL,
+    uncertainty DECIMAL(6,5) NOT NULL,  -- 1 - |2p - 1|, 1.0 = maximally uncertain
+    model_version INTEGER REFERENCES model_versions(id),
+
+    -- Claims expire so abandoned work returns to the queue
+    claimed_by VARCHAR(100),
+    claimed_at TIMESTAMP,
+
+    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table: backfill_checkpoints
+-- Completed signal_id ranges per model version for historical rescoring
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    model_version_id INTEGER NOT NULL REFERENCES model_versions(id),
+    range_start INTEGER NOT NULL,  -- Inclusive signal_id
+    range_end INTEGER NOT NULL,  -- Exclusive signal_id
+    rows_written INTEGER NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model_version_id, range_start)
+);
+
 -- Indexes for performance
 CREATE INDEX idx_twitter_game_id ON twitter_data(game_id);
 CREATE INDEX idx_twitter_timestamp ON twitter_data(timestamp);
@@ -167,7 +230,14 @@ CREATE INDEX idx_ground_truth_game_id ON signal_ground_truth(game_id);
 CREATE INDEX idx_ground_truth_labeled ON signal_ground_truth(manual_label) WHERE manual_label IS NOT NULL;
 CREATE INDEX idx_ground_truth_unlabeled ON signal_ground_truth(game_id) WHERE manual_label IS NULL;
 CREATE INDEX idx_ground_truth_labeler ON signal_ground_truth(labeler_address);
+CREATE INDEX idx_ground_truth_created_at ON signal_ground_truth(created_at);
+
+CREATE INDEX idx_twitter_game_timestamp ON twitter_data(game_id, timestamp);
+
+CREATE INDEX idx_signal_features_labeled ON signal_features(signal_timestamp) WHERE label IS NOT NULL;
+CREATE INDEX idx_signal_features_unlabeled ON signal_features(signal_id) WHERE label IS NULL;
 
+CREATE INDEX idx_labeling_queue_priority ON labeling_queue(uncertainty DESC, ground_truth_id);
 CREATE INDEX idx_model_versions_active ON model_versions(is_active);
 CREATE INDEX idx_model_versions_name ON model_versions(model_name);
 
@@ -273,6 +343,27 @@ CREATE TABLE IF NOT EXISTS pm_trades (
   UNIQUE(tx_hash, log_index)  -- Prevent duplicates (idempotency)
 );
 
+-- Table: pm_market_anomalies
+-- Per-market anomaly scores over pm_trades, peak score per one-minute bucket
+-- (written by backend/ml-service/market_anomaly.py)
+CREATE TABLE IF NOT EXISTS pm_market_anomalies (
+  market_id INTEGER NOT NULL REFERENCES markets(id) ON DELETE CASCADE,
+  bucket_start TIMESTAMP NOT NULL,
+  anomaly_score DECIMAL(5,4) NOT NULL,
+  anomaly_detected BOOLEAN DEFAULT FALSE,
+
+  -- Components at the bucket's peak trade
+  price_z DECIMAL(12,4),
+  volume_z DECIMAL(12,4),
+  flow_imbalance DECIMAL(5,4),
+
+  trade_count INTEGER NOT NULL,
+  last_trade_id INTEGER NOT NULL,  -- Tail watermark
+  updated_at TIMESTAMP DEFAULT NOW(),
+
+  PRIMARY KEY (market_id, bucket_start)
+);
+
 -- Table: sync_state
 -- Tracks blockchain sync progress
 CREATE TABLE IF NOT EXISTS sync_state (
@@ -384,6 +475,10 @@ CREATE INDEX idx_pm_trades_tx_hash ON pm_trades(tx_hash);
 CREATE INDEX idx_pm_trades_block ON pm_trades(block_number);
 CREATE INDEX idx_pm_trades_timestamp ON pm_trades(block_timestamp);
 CREATE INDEX idx_pm_trades_token ON pm_trades(token_id);
+CREATE INDEX idx_pm_trades_market_time ON pm_trades(market_id, block_timestamp, id);
+
+CREATE INDEX idx_pm_anomalies_last_trade ON pm_market_anomalies(last_trade_id);
+CREATE INDEX idx_pm_anomalies_detected ON pm_market_anomalies(bucket_start) WHERE anomaly_detected;
 
 -- Indexes for user tables
 CREATE INDEX idx_users_email ON users(email);
@@ -3,10 +3,25 @@ Flask API Server for ML Service
 Provides HTTP endpoints for model training and predictions
 """
 
+import os
+import sys
+import time
 import logging
-from flask import Flask, request, jsonify
+import itertools
+import numpy as np
+from contextlib import ExitStack
+from flask import Flask, Response, request, jsonify, g, stream_with_context
 from flask_cors import CORS
+
+# Shared Python modules live in backend/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
 from ml_service import MLService
+from batching import MicroBatcher, QueueFullError
+from model_registry import ModelNotFoundError
+import payloads
+from sampling_profiler import SamplingProfiler
+import metrics
 
 app = Flask(__name__)
 CORS(app)
@@ -14,20 +29,57 @@ CORS(app)
 # Initialize ML service
 ml_service = MLService()
 
+# Batched serving: concurrent /predict calls are coalesced into one forest call
+serving_mode = os.getenv('ML_SERVING_MODE', 'simple')
+batcher = None
+if serving_mode == 'batched':
+    batcher = MicroBatcher(
+        ml_service.predict_batch,
+        max_batch_size=int(os.getenv('ML_MAX_BATCH_SIZE', 64)),
+        max_wait_ms=float(os.getenv('ML_MAX_WAIT_MS', 2)),
+        max_queue_size=int(os.getenv('ML_MAX_QUEUE_SIZE', 1024))
+    )
+
+# Opt-in profiling: PROFILE_SAMPLE_RATE samples requests,
+# PROFILING_ENABLED exposes the /admin/profile endpoints
+profiler = SamplingProfiler.from_env()
+profiling_enabled = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
+@app.before_request
+def start_request_profile():
+    g.profile = ExitStack()
+    g.profile.enter_context(profiler.track())
+
+
+@app.teardown_request
+def stop_request_profile(error=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.close()
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'service': 'ml-service',
-        'model_loaded': ml_service.model is not None
+        'model_loaded': ml_service.model is not None,
+        'database': ml_service.db.check_health()
     }), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 @app.route('/api/ml/train', methods=['POST'])
 def train_model():
     """
@@ -46,6 +98,36 @@ def train_model():
         }), 500
 
 
+@app.route('/api/ml/tune', methods=['POST'])
+def tune_model():
+    """
+    Run a hyperparameter search and deploy the winning model
+    POST /api/ml/tune
+    Body (optional): {
+        "n_splits": 5,
+        "max_candidates": 24,
+        "max_workers": 4,
+        "search_space": {"n_estimators": [50, 100], "max_depth": [8, null]}
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        logger.info("Starting hyperparameter search...")
+        result = ml_service.tune_model(
+            search_space=data.get('search_space'),
+            n_splits=int(data.get('n_splits', 5)),
+            max_candidates=data.get('max_candidates'),
+            max_workers=data.get('max_workers')
+        )
+        return jsonify(result), 200 if result['success'] else 400
+    except Exception as e:
+        logger.error(f"Tuning error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/ml/predict', methods=['POST'])
 def predict():
     """
@@ -55,8 +137,12 @@ def predict():
         "rigging_index": 0.75,
         "anomaly_score": 0.82,
         "tweet_count": 150,
-        "avg_sentiment": 0.45
+        "avg_sentiment": 0.45,
+        "explain": false,
+        "model_version": null
     }
+    "explain": true adds per-feature contributions to the rigged probability;
+    "model_version" scores with a specific version instead of the active one
     """
     try:
         data = request.get_json()
@@ -73,14 +159,36 @@ def predict():
         tweet_count = data.get('tweet_count', 0)
         avg_sentiment = data.get('avg_sentiment', 0)
 
-        result = ml_service.predict(
-            rigging_index=float(data['rigging_index']),
-            anomaly_score=float(data['anomaly_score']),
-            tweet_count=int(tweet_count),
-            avg_sentiment=float(avg_sentiment)
-        )
+        explain = bool(data.get('explain', False))
+        model_version = data.get('model_version')
+        if model_version is not None:
+            model_version = int(model_version)
+            ml_service.resolve_model(model_version)
+
+        if batcher is not None and not explain and model_version is None:
+            features = ml_service.build_features(
+                float(data['rigging_index']),
+                float(data['anomaly_score']),
+                int(tweet_count),
+                float(avg_sentiment)
+            )
+            try:
+                result = batcher.predict(features)
+            except QueueFullError as e:
+                return jsonify({'success': False, 'error': str(e)}), 503
+        else:
+            result = ml_service.predict(
+                rigging_index=float(data['rigging_index']),
+                anomaly_score=float(data['anomaly_score']),
+                tweet_count=int(tweet_count),
+                avg_sentiment=float(avg_sentiment),
+                explain=explain,
+                model_version=model_version
+            )
 
         return jsonify(result), 200 if result['success'] else 400
+    except ModelNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return jsonify({
@@ -98,11 +206,39 @@ def batch_predict():
         "signals": [
             {"rigging_index": 0.75, "anomaly_score": 0.82, ...},
             ...
-        ]
+        ],
+        "explain": false,
+        "model_version": null
     }
+    or, to score stored signals from the feature store:
+    Body: {"signal_ids": [101, 102, ...]}
+
+    Bulk clients can send application/x-npy or Arrow IPC stream bodies and
+    Accept application/x-ndjson or Arrow IPC stream responses (see payloads.py);
+    they select a version with ?model_version=
     """
     try:
+        if (request.mimetype in payloads.BINARY_INPUTS
+                or request.accept_mimetypes.best in payloads.STREAMING_OUTPUTS):
+            return stream_batch_predict()
+
         data = request.get_json()
+        model_version = data.get('model_version')
+        if model_version is not None:
+            model_version = int(model_version)
+            ml_service.resolve_model(model_version)
+
+        if 'signal_ids' in data:
+            signal_ids = data['signal_ids']
+            if not isinstance(signal_ids, list) or not signal_ids:
+                return jsonify({
+                    'success': False,
+                    'error': 'signal_ids must be a non-empty array'
+                }), 400
+
+            result = ml_service.predict_signals([int(s) for s in signal_ids], model_version)
+            return jsonify(result), 200 if result['success'] else 400
+
         signals = data.get('signals', [])
 
         if not isinstance(signals, list) or not signals:
@@ -111,16 +247,26 @@ def batch_predict():
                 'error': 'signals must be a non-empty array'
             }), 400
 
-        predictions = []
-        for signal in signals:
-            result = ml_service.predict(
-                rigging_index=float(signal.get('rigging_index', 0)),
-                anomaly_score=float(signal.get('anomaly_score', 0)),
-                tweet_count=int(signal.get('tweet_count', 0)),
-                avg_sentiment=float(signal.get('avg_sentiment', 0))
+        metrics.BATCH_SIZE.observe(len(signals))
+        start = time.perf_counter()
+
+        features = np.array([
+            ml_service.build_features(
+                float(signal.get('rigging_index', 0)),
+                float(signal.get('anomaly_score', 0)),
+                int(signal.get('tweet_count', 0)),
+                float(signal.get('avg_sentiment', 0))
+            )
+            for signal in signals
+        ])
+        predictions = [
+            result for result in ml_service.predict_batch(
+                features, explain=bool(data.get('explain', False)), model_version=model_version
             )
-            if result['success']:
-                predictions.append(result)
+            if result['success']
+        ]
+
+        metrics.PREDICT_SECONDS.labels('batch_predict').observe(time.perf_counter() - start)
 
         return jsonify({
             'success': True,
@@ -128,6 +274,8 @@ def batch_predict():
             'count': len(predictions)
         }), 200
 
+    except ModelNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         return jsonify({
@@ -136,6 +284,131 @@ def batch_predict():
         }), 500
 
 
+def stream_batch_predict():
+    """Chunked scoring for binary and/or streaming batch-predict requests"""
+    model_version = request.args.get('model_version', type=int)
+    try:
+        model, version = ml_service.resolve_model(model_version)
+    except ModelNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    if model is None:
+        return jsonify({
+            'success': False,
+            'error': 'No trained model available'
+        }), 400
+
+    if request.mimetype == payloads.NPY:
+        chunks = payloads.iter_npy_chunks(request.stream)
+    elif request.mimetype == payloads.ARROW_STREAM:
+        chunks = payloads.iter_arrow_chunks(request.stream)
+    else:
+        signals = (request.get_json() or {}).get('signals', [])
+        if not isinstance(signals, list) or not signals:
+            return jsonify({
+                'success': False,
+                'error': 'signals must be a non-empty array'
+            }), 400
+        chunks = payloads.iter_json_chunks(signals)
+
+    # Pull the first chunk now so malformed input fails with a 400
+    try:
+        first = next(chunks, None)
+    except payloads.PayloadError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if first is not None:
+        chunks = itertools.chain([first], chunks)
+
+    # Model info is sent once per response instead of once per prediction
+    header = {
+        'model_version': version,
+        'feature_importance': dict(zip(
+            ml_service.features,
+            model.feature_importances_.tolist()
+        ))
+    }
+
+    def score(inputs):
+        metrics.BATCH_SIZE.observe(len(inputs))
+        with metrics.PREDICT_SECONDS.labels('batch_predict_stream').time():
+            return ml_service.score_inputs(inputs, version)
+
+    if request.accept_mimetypes.best == payloads.ARROW_STREAM:
+        body, mimetype = payloads.arrow_stream(chunks, score, header), payloads.ARROW_STREAM
+    else:
+        body, mimetype = payloads.ndjson_stream(chunks, score, header), payloads.NDJSON
+
+    return Response(stream_with_context(body), mimetype=mimetype)
+
+
+@app.route('/api/ml/features/refresh', methods=['POST'])
+def refresh_features():
+    """
+    Incrementally refresh the signal feature store
+    POST /api/ml/features/refresh
+    """
+    try:
+        result = ml_service.feature_store.refresh()
+        return jsonify({'success': True, **result}), 200
+    except Exception as e:
+        logger.error(f"Feature refresh error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/ml/labeling-queue/refresh', methods=['POST'])
+def refresh_labeling_queue():
+    """
+    Score new unlabeled signals and re-rank the labeling queue
+    POST /api/ml/labeling-queue/refresh
+    """
+    result = ml_service.refresh_labeling_queue()
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/ml/labeling-queue/next', methods=['GET'])
+def next_labeling_tasks():
+    """
+    Claim the most uncertain unlabeled signals
+    GET /api/ml/labeling-queue/next?limit=10&labeler=0xabc...
+    """
+    try:
+        limit = min(int(request.args.get('limit', 10)), 100)
+        signals = ml_service.labeling_queue.next(limit, request.args.get('labeler'))
+        return jsonify({
+            'success': True,
+            'signals': signals,
+            'count': len(signals)
+        }), 200
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'limit must be an integer'
+        }), 400
+    except Exception as e:
+        logger.error(f"Labeling queue error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/ml/drift', methods=['GET', 'POST'])
+def check_drift():
+    """
+    Drift of served features and predictions against the training reference
+    GET /api/ml/drift
+    POST /api/ml/drift {"retrain": true}  (retrains if drift is detected)
+    """
+    data = request.get_json(silent=True) or {}
+    result = ml_service.check_drift(
+        retrain=bool(data.get('retrain', False)),
+        min_observations=int(request.args.get('min_observations', 500))
+    )
+    return jsonify(result), 200 if result['success'] else 404
+
+
 @app.route('/api/ml/model-info', methods=['GET'])
 def model_info():
     """Get information about the current model"""
@@ -146,10 +419,66 @@ def model_info():
         'success': True,
         'model_loaded': ml_service.model is not None,
         'model_version': ml_service.model_version,
-        'features': ml_service.features
+        'features': ml_service.features,
+        'registry': ml_service.registry.stats()
+    }), 200
+
+
+@app.route('/api/ml/shadow', methods=['GET'])
+def shadow_stats():
+    """
+    Agreement between the active model and the shadow challenger
+    (ML_SHADOW_VERSION)
+    GET /api/ml/shadow
+    """
+    if ml_service.shadow is None:
+        return jsonify({
+            'success': False,
+            'error': 'Shadow mode is disabled; set ML_SHADOW_VERSION'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'champion_version': ml_service.model_version,
+        **ml_service.shadow.stats()
     }), 200
 
 
+@app.route('/admin/profile', methods=['POST'])
+def capture_profile():
+    """
+    Capture a time-boxed profile of the whole process
+    POST /admin/profile?seconds=10
+    Returns collapsed stacks (flamegraph.pl / speedscope format)
+    """
+    if not profiling_enabled:
+        return not_found(None)
+
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        collapsed = profiler.capture(seconds)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+    profile_dir = os.getenv('PROFILE_DIR')
+    if profile_dir:
+        profiler.write(os.path.join(profile_dir, f"ml-service-{int(time.time())}.collapsed"), collapsed)
+
+    return Response(collapsed, mimetype='text/plain')
+
+
+@app.route('/admin/profile/sampled', methods=['GET'])
+def sampled_profile():
+    """
+    Collapsed stacks aggregated from sampled requests since the last call
+    GET /admin/profile/sampled
+    """
+    if not profiling_enabled:
+        return not_found(None)
+
+    return Response(profiler.collapsed(), mimetype='text/plain')
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -167,5 +496,10 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    logger.info("Starting ML Service API Server...")
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    logger.info(f"Starting ML Service API Server ({serving_mode} mode)...")
+    if serving_mode == 'batched':
+        # Many concurrent request threads are what lets batches fill up
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=5000, threads=int(os.getenv('ML_SERVER_THREADS', 64)))
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,252 @@
+"""
+Historical Rescoring Backfill
+Scores every signal in the feature store with one model version, in
+parallel id-range partitions, writing model_predictions with COPY
+
+Usage:
+    python backfill.py [--model-version 12] [--partition-size 50000] [--workers 4] [--restart]
+"""
+
+import os
+import sys
+import io
+import csv
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import psycopg2
+
+# Shared Python modules live in backend/shared (also needed when run as a script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from pg_pool import PostgresPool
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = [
+    'rigging_index',
+    'anomaly_score',
+    'tweet_count',
+    'avg_sentiment',
+    'hour_of_day',
+    'day_of_week'
+]
+
+# Worker-process state, set up once per worker by _init_worker
+_conn = None
+_model = None
+_model_version = None
+
+
+def _init_worker(db_config: Dict[str, Any], model_path: str, model_version: int):
+    global _conn, _model, _model_version
+    from ml_service import load_model_artifact
+
+    _model = load_model_artifact(model_path)
+    _model.n_jobs = 1
+    _model_version = model_version
+    # Own connection per worker: nothing is shared with the parent process
+    _conn = psycopg2.connect(**db_config)
+
+
+def _score_partition(start: int, end: int) -> Tuple[int, int, float]:
+    """
+    Score signals with start <= signal_id < end. Predictions and the
+    partition's checkpoint commit in one transaction, so an interrupted
+    partition leaves nothing behind and is simply redone.
+    """
+    began = time.perf_counter()
+    try:
+        with _conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT signal_id, signal_timestamp, {', '.join(FEATURE_COLUMNS)}
+                FROM signal_features
+                WHERE signal_id >= %s AND signal_id < %s
+                ORDER BY signal_id
+            """, (start, end))
+            rows = cursor.fetchall()
+
+            if rows:
+                features = np.array([row[2:] for row in rows], dtype=np.float64)
+                rigged_index = int(np.flatnonzero(_model.classes_ == 1)[0])
+                rigged = _model.predict_proba(features)[:, rigged_index]
+
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row, values, p in zip(rows, features.tolist(), rigged.tolist()):
+                    writer.writerow([
+                        row[0],
+                        _model_version,
+                        't' if p > 0.5 else 'f',
+                        f"{p:.4f}",
+                        f"{max(p, 1.0 - p):.4f}",
+                        json.dumps(dict(zip(FEATURE_COLUMNS, values))),
+                        row[1].isoformat()
+                    ])
+                buffer.seek(0)
+
+                cursor.copy_expert("""
+                    COPY model_predictions (
+                        signal_id, model_version_id, predicted_label,
+                        prediction_probability, confidence, features, timestamp
+                    ) FROM STDIN WITH (FORMAT csv)
+                """, buffer)
+
+            cursor.execute("""
+                INSERT INTO backfill_checkpoints (model_version_id, range_start, range_end, rows_written)
+                VALUES (%s, %s, %s, %s)
+            """, (_model_version, start, end, len(rows)))
+
+        _conn.commit()
+        return start, len(rows), time.perf_counter() - began
+
+    except Exception:
+        _conn.rollback()
+        raise
+
+
+class Backfill:
+    """
+    Partitions the signal_id space into fixed-width ranges and scores them
+    in a process pool. Each worker loads the model once; completed ranges
+    are recorded in backfill_checkpoints and skipped on the next run.
+    """
+
+    def __init__(self, db: PostgresPool, db_config: Dict[str, Any],
+                 partition_size: int = 50000, max_workers: Optional[int] = None):
+        self.db = db
+        self.db_config = db_config
+        self.partition_size = partition_size
+        self.max_workers = max_workers
+
+    def run(self, model_version: Optional[int] = None, restart: bool = False) -> Dict[str, Any]:
+        model_version, model_path = self._resolve_model(model_version)
+
+        if restart:
+            self._reset(model_version)
+
+        pending = self._pending_partitions(model_version)
+        if not pending:
+            logger.info(f"Backfill for model version {model_version} is already complete")
+            return {'model_version': model_version, 'partitions': 0, 'rows': 0}
+
+        logger.info(f"Backfilling model version {model_version}: {len(pending)} partitions pending")
+
+        start = time.perf_counter()
+        rows_written = 0
+        failed = []
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=(self.db_config, model_path, model_version)) as executor:
+            futures = {
+                executor.submit(_score_partition, range_start, range_end): range_start
+                for range_start, range_end in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    _, rows, seconds = future.result()
+                    rows_written += rows
+                    logger.info(f"Partition {futures[future]}: {rows} rows in {seconds:.2f}s "
+                                f"({done}/{len(pending)})")
+                except Exception as e:
+                    logger.error(f"Partition {futures[future]} failed: {e}")
+                    failed.append(futures[future])
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Backfill wrote {rows_written} predictions in {elapsed:.1f}s")
+
+        return {
+            'model_version': model_version,
+            'partitions': len(pending) - len(failed),
+            'failed_partitions': sorted(failed),
+            'rows': rows_written,
+            'seconds': round(elapsed, 2)
+        }
+
+    def _resolve_model(self, model_version: Optional[int]) -> Tuple[int, str]:
+        with self.db.cursor() as cursor:
+            if model_version is None:
+                self.db.execute_prepared(cursor, 'latest_active_model')
+            else:
+                self.db.execute(cursor, "SELECT id, model_path FROM model_versions WHERE id = %s",
+                                (model_version,), name='backfill_model')
+            row = cursor.fetchone()
+
+        if row is None or not row[1]:
+            raise ValueError(f"No model artifact for version {model_version or 'active'}")
+
+        return row[0], row[1]
+
+    def _reset(self, model_version: int):
+        with self.db.cursor() as cursor:
+            self.db.execute(cursor, """
+                DELETE FROM model_predictions mp
+                WHERE mp.model_version_id = %s
+                  AND EXISTS (
+                      SELECT 1 FROM backfill_checkpoints bc
+                      WHERE bc.model_version_id = mp.model_version_id
+                        AND mp.signal_id >= bc.range_start AND mp.signal_id < bc.range_end
+                  )
+            """, (model_version,), name='backfill_reset_predictions')
+            self.db.execute(cursor, "DELETE FROM backfill_checkpoints WHERE model_version_id = %s",
+                            (model_version,), name='backfill_reset_checkpoints')
+
+    def _pending_partitions(self, model_version: int) -> List[Tuple[int, int]]:
+        with self.db.cursor() as cursor:
+            self.db.execute(cursor, "SELECT MIN(signal_id), MAX(signal_id) FROM signal_features",
+                            name='backfill_bounds')
+            low, high = cursor.fetchone()
+            self.db.execute(cursor, """
+                SELECT range_start, range_end FROM backfill_checkpoints WHERE model_version_id = %s
+            """, (model_version,), name='backfill_completed')
+            completed = cursor.fetchall()
+
+        if low is None:
+            return []
+
+        # Partitions are aligned to multiples of partition_size so the
+        # boundaries stay stable between runs. The newest partition is cut
+        # at the current max id; signals that arrive later are picked up
+        # as the remainder of that partition on the next run.
+        covered = {}
+        for range_start, range_end in completed:
+            aligned = (range_start // self.partition_size) * self.partition_size
+            covered[aligned] = max(covered.get(aligned, aligned), range_end)
+
+        first = (low // self.partition_size) * self.partition_size
+        pending = []
+        for aligned in range(first, high + 1, self.partition_size):
+            start = covered.get(aligned, aligned)
+            end = min(aligned + self.partition_size, high + 1)
+            if start < end:
+                pending.append((start, end))
+        return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rescore historical signals with a model version')
+    parser.add_argument('--model-version', type=int, help='defaults to the active model')
+    parser.add_argument('--partition-size', type=int, default=50000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--restart', action='store_true', help='discard checkpoints and earlier backfill output')
+    args = parser.parse_args()
+
+    from ml_service import MLService
+
+    service = MLService()
+    service.feature_store.refresh()
+
+    result = Backfill(
+        service.db, service.db_config,
+        partition_size=args.partition_size,
+        max_workers=args.workers
+    ).run(args.model_version, restart=args.restart)
+    logger.info(f"Backfill result: {result}")
+
+
+if __name__ == '__main__':
+    main()
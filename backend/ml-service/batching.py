@@ -0,0 +1,87 @@
+"""
+Dynamic Micro-Batching for Predictions
+Coalesces concurrent single predictions into one matrix inference
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any
+import numpy as np
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the batching queue is at capacity"""
+    pass
+
+
+class MicroBatcher:
+    """
+    Collects feature rows from request threads into a bounded queue.
+
+    A single worker thread takes the first waiting row, then keeps
+    collecting until max_batch_size rows are queued or max_wait_ms has
+    passed since that first row, scores the whole matrix in one call and
+    resolves each caller's future. Added latency is bounded by max_wait_ms;
+    under concurrency, batches fill before the deadline.
+    """
+
+    def __init__(self, score_batch: Callable[[np.ndarray], List[Dict[str, Any]]],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0, max_queue_size: int = 1024):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, features: List[float]) -> Future:
+        """Queue one feature row; the future resolves to its prediction dict"""
+        future = Future()
+        try:
+            self.queue.put_nowait((features, future))
+        except queue.Full:
+            raise QueueFullError("Prediction queue is full")
+        metrics.BATCHER_QUEUE_DEPTH.set(self.queue.qsize())
+        return future
+
+    def predict(self, features: List[float], timeout: float = 5.0) -> Dict[str, Any]:
+        """Submit and wait for the result"""
+        return self.submit(features).result(timeout=timeout)
+
+    def _collect(self) -> list:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            metrics.BATCHER_QUEUE_DEPTH.set(self.queue.qsize())
+            metrics.MICROBATCH_SIZE.observe(len(batch))
+
+            futures = [future for _, future in batch]
+            try:
+                with metrics.PREDICT_SECONDS.labels('microbatch').time():
+                    results = self.score_batch(np.array([features for features, _ in batch]))
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Micro-batch scoring error: {e}")
+                for future in futures:
+                    future.set_exception(e)
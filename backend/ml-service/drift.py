@@ -0,0 +1,139 @@
+"""
+Input and Prediction Drift Monitor
+Constant-memory streaming histograms compared against a training-time
+reference with the Population Stability Index (PSI)
+"""
+
+import threading
+from typing import Any, Dict, List
+import numpy as np
+
+REFERENCE_BINS = 10
+
+# Conventional PSI bands: < 0.1 stable, 0.1 - 0.25 moderate shift, > 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+
+# Floor for empty bins, keeps PSI finite
+MIN_PROPORTION = 1e-4
+
+PREDICTION = 'probability_rigged'
+
+# Filled from the serving clock rather than the request, so recent traffic
+# always sits in one or two bins; comparing them to training is meaningless
+UNMONITORED_FEATURES = ('hour_of_day', 'day_of_week')
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+
+
+def build_reference(features: np.ndarray, probabilities: np.ndarray,
+                    feature_names: List[str], bins: int = REFERENCE_BINS) -> Dict[str, Any]:
+    """
+    Reference distributions from training data: quantile bins per
+    monitored feature (deduplicated for discrete features) and fixed-width
+    bins for the rigged-class probability. 'features' keeps the full column
+    order of served rows. Stored as JSON with the model version.
+    """
+    reference = {'features': list(feature_names), 'bins': {}}
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+
+    columns = [(name, features[:, i], np.unique(np.quantile(features[:, i], quantiles)))
+               for i, name in enumerate(feature_names) if name not in UNMONITORED_FEATURES]
+    columns.append((PREDICTION, probabilities, np.linspace(0, 1, bins + 1)[1:-1]))
+
+    for name, values, edges in columns:
+        counts = _histogram(values, edges)
+        reference['bins'][name] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / max(counts.sum(), 1)).tolist()
+        }
+
+    return reference
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population Stability Index between two proportion vectors"""
+    expected = np.maximum(expected, MIN_PROPORTION)
+    actual = np.maximum(actual, MIN_PROPORTION)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """
+    Streaming histograms of served features and predictions on the
+    reference bin edges.
+
+    Counts decay exponentially with a half-life measured in observations,
+    so the live distribution tracks recent traffic in fixed memory and no
+    request data is retained.
+
+    Wall-clock features are skipped, including in references stored before
+    they were left out.
+    """
+
+    def __init__(self, reference: Dict[str, Any], half_life: int = 10000):
+        self.reference = reference
+        self.feature_names = reference['features']
+        self.half_life = half_life
+        bins = {name: values for name, values in reference['bins'].items()
+                if name not in UNMONITORED_FEATURES}
+        # (column in served rows, name) of each monitored feature
+        self._columns = [(i, name) for i, name in enumerate(self.feature_names) if name in bins]
+        self._edges = {name: np.asarray(values['edges']) for name, values in bins.items()}
+        self._expected = {name: np.asarray(values['proportions']) for name, values in bins.items()}
+        self._counts = {name: np.zeros(len(edges) + 1) for name, edges in self._edges.items()}
+        self._observations = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, features: np.ndarray, probabilities: np.ndarray):
+        """Fold a batch of served rows (self.feature_names order) into the histograms"""
+        n = len(probabilities)
+        if n == 0:
+            return
+
+        histograms = {
+            name: _histogram(features[:, i], self._edges[name])
+            for i, name in self._columns
+        }
+        histograms[PREDICTION] = _histogram(probabilities, self._edges[PREDICTION])
+        decay = 0.5 ** (n / self.half_life)
+
+        with self._lock:
+            for name, histogram in histograms.items():
+                self._counts[name] *= decay
+                self._counts[name] += histogram
+            self._observations = self._observations * decay + n
+
+    def scores(self) -> Dict[str, float]:
+        """PSI per feature and for predictions"""
+        with self._lock:
+            counts = {name: values.copy() for name, values in self._counts.items()}
+
+        return {
+            name: psi(self._expected[name], values / values.sum()) if values.sum() > 0 else 0.0
+            for name, values in counts.items()
+        }
+
+    def status(self, min_observations: int = 500) -> Dict[str, Any]:
+        """Drift scores with an overall verdict"""
+        scores = self.scores()
+        worst = max(scores.values())
+
+        if self._observations < min_observations:
+            verdict = 'insufficient_data'
+        elif worst >= PSI_DRIFT:
+            verdict = 'drift'
+        elif worst >= PSI_WARNING:
+            verdict = 'warning'
+        else:
+            verdict = 'ok'
+
+        return {
+            'status': verdict,
+            'psi': {name: round(score, 4) for name, score in scores.items()},
+            'drifted': sorted(name for name, score in scores.items() if score >= PSI_DRIFT),
+            'effective_observations': round(self._observations, 1),
+            'half_life': self.half_life
+        }
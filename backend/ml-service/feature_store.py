@@ -0,0 +1,204 @@
+"""
+Feature Store for ML Service
+Precomputes per-signal model features so training and scoring read one table
+"""
+
+import logging
+from typing import Dict, List, Optional
+import pandas as pd
+from psycopg2.extras import RealDictCursor
+from pg_pool import PostgresPool
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureStore:
+    """
+    Maintains the signal_features table.
+
+    Each signal_logs row gets exactly one feature row, computed once from the
+    latest twitter_data row for the same game at or before the signal
+    timestamp (the nearest snapshot that existed when the signal fired).
+
+    Labels are synced from signal_ground_truth incrementally: each sync
+    rescans ground-truth rows created since the previous sync, minus
+    late_commit_grace_seconds, so a row whose transaction commits after a
+    sync has passed its created_at is still picked up. The watermark is
+    kept in feature_store_state.
+    """
+
+    FEATURE_COLUMNS = [
+        'rigging_index',
+        'anomaly_score',
+        'tweet_count',
+        'avg_sentiment',
+        'hour_of_day',
+        'day_of_week'
+    ]
+
+    def __init__(self, db: PostgresPool, batch_size: int = 5000,
+                 late_commit_grace_seconds: int = 600):
+        self.db = db
+        self.batch_size = batch_size
+        self.late_commit_grace_seconds = late_commit_grace_seconds
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Incrementally add features for new signals and sync new labels
+        """
+        try:
+            with self.db.connection() as conn:
+                return self._refresh(conn)
+        except Exception as e:
+            logger.error(f"Error refreshing feature store: {e}")
+            raise
+
+    def _refresh(self, conn) -> Dict[str, int]:
+        cursor = conn.cursor()
+        try:
+            self.db.execute(cursor, "SELECT COALESCE(MAX(signal_id), 0) FROM signal_features",
+                            name='feature_store_watermark')
+            last_signal_id = cursor.fetchone()[0]
+
+            inserted = 0
+            while True:
+                self.db.execute(cursor, """
+                    INSERT INTO signal_features (
+                        signal_id, ground_truth_id, game_id, signal_timestamp,
+                        rigging_index, anomaly_score, tweet_count, avg_sentiment,
+                        hour_of_day, day_of_week, label
+                    )
+                    SELECT
+                        sl.id,
+                        sgt.id,
+                        sl.game_id,
+                        COALESCE(sl.timestamp, sl.created_at),
+                        COALESCE(sl.rigging_index, sgt.rigging_index, 0),
+                        COALESCE(sl.anomaly_score, sgt.anomaly_score, 0),
+                        COALESCE(td.tweet_count, 0),
+                        COALESCE(td.avg_sentiment, 0),
+                        EXTRACT(HOUR FROM COALESCE(sl.timestamp, sl.created_at))::int,
+                        EXTRACT(DOW FROM COALESCE(sl.timestamp, sl.created_at))::int,
+                        sgt.manual_label
+                    FROM signal_logs sl
+                    LEFT JOIN LATERAL (
+                        SELECT id, rigging_index, anomaly_score, manual_label
+                        FROM signal_ground_truth
+                        WHERE signal_id = sl.id
+                        ORDER BY id DESC
+                        LIMIT 1
+                    ) sgt ON TRUE
+                    LEFT JOIN LATERAL (
+                        SELECT tweet_count, avg_sentiment
+                        FROM twitter_data
+                        WHERE game_id = sl.game_id
+                          AND timestamp <= COALESCE(sl.timestamp, sl.created_at)
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                    ) td ON TRUE
+                    WHERE sl.id > %s
+                    ORDER BY sl.id
+                    LIMIT %s
+                    ON CONFLICT (signal_id) DO NOTHING
+                    RETURNING signal_id
+                """, (last_signal_id, self.batch_size), name='feature_store_insert')
+                rows = cursor.fetchall()
+                conn.commit()
+
+                if not rows:
+                    break
+
+                inserted += len(rows)
+                last_signal_id = max(row[0] for row in rows)
+
+                if len(rows) < self.batch_size:
+                    break
+
+            labels_synced = self._sync_labels(cursor)
+            conn.commit()
+
+            logger.info(f"Feature store refreshed: {inserted} new signals, {labels_synced} labels synced")
+
+            return {
+                'inserted': inserted,
+                'labels_synced': labels_synced
+            }
+
+        finally:
+            cursor.close()
+
+    def _sync_labels(self, cursor) -> int:
+        """
+        Point each feature row at its signal's latest ground-truth row.
+        The rescanned overlap is idempotent: rows already pointing at that
+        ground-truth row (or a newer one) are left alone.
+        """
+        self.db.execute(cursor, """
+            SELECT watermark FROM feature_store_state WHERE key = 'label_sync'
+        """, name='feature_store_label_watermark')
+        row = cursor.fetchone()
+        # Taken before the scan, so rows created during it are rescanned next time
+        self.db.execute(cursor, "SELECT LOCALTIMESTAMP", name='feature_store_now')
+        sync_started = cursor.fetchone()[0]
+
+        self.db.execute(cursor, """
+            UPDATE signal_features sf
+            SET label = sgt.manual_label,
+                ground_truth_id = sgt.id,
+                updated_at = NOW()
+            FROM (
+                SELECT DISTINCT ON (signal_id) id, signal_id, manual_label
+                FROM signal_ground_truth
+                WHERE signal_id IS NOT NULL
+                  AND created_at > COALESCE(%s::timestamp - %s * INTERVAL '1 second', '-infinity')
+                ORDER BY signal_id, id DESC
+            ) sgt
+            WHERE sgt.signal_id = sf.signal_id
+              AND (sf.ground_truth_id IS NULL OR sgt.id > sf.ground_truth_id)
+        """, (row[0] if row else None, self.late_commit_grace_seconds),
+            name='feature_store_sync_labels')
+        labels_synced = cursor.rowcount
+
+        self.db.execute(cursor, """
+            INSERT INTO feature_store_state (key, watermark, updated_at)
+            VALUES ('label_sync', %s, NOW())
+            ON CONFLICT (key) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = NOW()
+        """, (sync_started,), name='feature_store_save_watermark')
+
+        return labels_synced
+
+    def load_labeled(self) -> Optional[pd.DataFrame]:
+        """
+        Load labeled feature rows in signal time order
+        """
+        query = f"""
+        SELECT signal_id, signal_timestamp, {', '.join(self.FEATURE_COLUMNS)}, label
+        FROM signal_features
+        WHERE label IS NOT NULL
+        ORDER BY signal_timestamp
+        """
+        return self._load(query)
+
+    def load_features(self, signal_ids: List[int]) -> Optional[pd.DataFrame]:
+        """
+        Load feature rows for specific signals (batch scoring)
+        """
+        query = f"""
+        SELECT signal_id, signal_timestamp, {', '.join(self.FEATURE_COLUMNS)}
+        FROM signal_features
+        WHERE signal_id = ANY(%s)
+        ORDER BY signal_id
+        """
+        return self._load(query, (list(signal_ids),))
+
+    def _load(self, query: str, params: tuple = None) -> Optional[pd.DataFrame]:
+        with self.db.cursor(cursor_factory=RealDictCursor) as cursor:
+            self.db.execute(cursor, query, params, name='feature_store_load')
+            rows = cursor.fetchall()
+
+        if not rows:
+            return None
+
+        df = pd.DataFrame(rows)
+        df[self.FEATURE_COLUMNS] = df[self.FEATURE_COLUMNS].astype(float)
+        return df
@@ -0,0 +1,198 @@
+"""
+Uncertainty-Ranked Labeling Queue
+Scores unlabeled signal_ground_truth rows with the active model and keeps
+them in a priority table, most uncertain first
+
+Usage:
+    python labeling_queue.py [--chunk-size 5000]
+"""
+
+import os
+import sys
+import logging
+import argparse
+from typing import Any, Dict, List
+import numpy as np
+from psycopg2.extras import RealDictCursor, execute_values
+from sklearn.ensemble import RandomForestClassifier
+
+# Shared Python modules live in backend/shared (also needed when run as a script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from pg_pool import PostgresPool
+
+logger = logging.getLogger(__name__)
+
+
+class LabelingQueue:
+    """
+    Maintains the labeling_queue table.
+
+    Labels are recorded as new signal_ground_truth rows, so a signal counts
+    as labeled once any of its rows has a manual_label. Each refresh scores,
+    in chunks, every ground-truth row of an unlabeled signal that is not yet
+    queued or was scored by an older model version, then drops rows whose
+    signal has been labeled since. Uncertainty is 1 - |2p - 1|, so signals
+    the forest is split on (p near 0.5) are served first.
+
+    Features come from signal_features when the signal has a feature row,
+    otherwise from the ground-truth row itself.
+    """
+
+    def __init__(self, db: PostgresPool, chunk_size: int = 5000, lease_minutes: int = 30):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.lease_minutes = lease_minutes
+
+    def refresh(self, model: RandomForestClassifier, model_version: int) -> Dict[str, int]:
+        """
+        Incrementally score new unlabeled signals (or all of them after a
+        model change) and remove labeled ones
+        """
+        try:
+            with self.db.connection() as conn:
+                return self._refresh(conn, model, model_version)
+        except Exception as e:
+            logger.error(f"Error refreshing labeling queue: {e}")
+            raise
+
+    def _refresh(self, conn, model: RandomForestClassifier, model_version: int) -> Dict[str, int]:
+        cursor = conn.cursor()
+        rigged_index = int(np.flatnonzero(model.classes_ == 1)[0])
+        try:
+            scored = 0
+            last_id = 0
+            while True:
+                self.db.execute(cursor, """
+                    SELECT
+                        sgt.id,
+                        sgt.signal_id,
+                        sgt.game_id,
+                        COALESCE(sf.rigging_index, sgt.rigging_index, 0),
+                        COALESCE(sf.anomaly_score, sgt.anomaly_score, 0),
+                        COALESCE(sf.tweet_count, 0),
+                        COALESCE(sf.avg_sentiment, 0),
+                        COALESCE(sf.hour_of_day, EXTRACT(HOUR FROM sgt.timestamp)::int),
+                        COALESCE(sf.day_of_week, EXTRACT(DOW FROM sgt.timestamp)::int)
+                    FROM signal_ground_truth sgt
+                    LEFT JOIN signal_features sf ON sf.signal_id = sgt.signal_id
+                    LEFT JOIN labeling_queue lq ON lq.ground_truth_id = sgt.id
+                    WHERE sgt.manual_label IS NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM signal_ground_truth l
+                          WHERE l.signal_id = sgt.signal_id AND l.manual_label IS NOT NULL
+                      )
+                      AND sgt.id > %s
+                      AND (lq.ground_truth_id IS NULL OR lq.model_version IS DISTINCT FROM %s)
+                    ORDER BY sgt.id
+                    LIMIT %s
+                """, (last_id, model_version, self.chunk_size), name='labeling_queue_candidates')
+                rows = cursor.fetchall()
+
+                if not rows:
+                    break
+
+                features = np.array([row[3:] for row in rows], dtype=np.float64)
+                rigged = model.predict_proba(features)[:, rigged_index]
+                uncertainty = 1.0 - np.abs(2.0 * rigged - 1.0)
+
+                execute_values(cursor, """
+                    INSERT INTO labeling_queue (
+                        ground_truth_id, signal_id, game_id,
+                        probability_rigged, uncertainty, model_version
+                    ) VALUES %s
+                    ON CONFLICT (ground_truth_id) DO UPDATE SET
+                        probability_rigged = EXCLUDED.probability_rigged,
+                        uncertainty = EXCLUDED.uncertainty,
+                        model_version = EXCLUDED.model_version,
+                        scored_at = NOW()
+                """, [
+                    (row[0], row[1], row[2], round(p, 5), round(u, 5), model_version)
+                    for row, p, u in zip(rows, rigged.tolist(), uncertainty.tolist())
+                ], page_size=1000)
+                conn.commit()
+
+                scored += len(rows)
+                last_id = rows[-1][0]
+
+                if len(rows) < self.chunk_size:
+                    break
+
+            self.db.execute(cursor, """
+                DELETE FROM labeling_queue lq
+                WHERE EXISTS (
+                    SELECT 1 FROM signal_ground_truth l
+                    WHERE l.signal_id = lq.signal_id AND l.manual_label IS NOT NULL
+                ) OR EXISTS (
+                    SELECT 1 FROM signal_ground_truth sgt
+                    WHERE sgt.id = lq.ground_truth_id AND sgt.manual_label IS NOT NULL
+                )
+            """, name='labeling_queue_prune')
+            removed = cursor.rowcount
+            conn.commit()
+
+            logger.info(f"Labeling queue refreshed: {scored} scored, {removed} labeled rows removed")
+
+            return {
+                'scored': scored,
+                'removed': removed
+            }
+
+        finally:
+            cursor.close()
+
+    def next(self, limit: int = 10, labeler: str = None) -> List[Dict[str, Any]]:
+        """
+        Claim the most uncertain unclaimed signals. Claims expire after
+        lease_minutes so abandoned work returns to the queue; concurrent
+        labelers never receive the same rows. Signals labeled since the
+        last refresh are skipped.
+        """
+        with self.db.cursor(cursor_factory=RealDictCursor) as cursor:
+            self.db.execute(cursor, """
+                UPDATE labeling_queue
+                SET claimed_by = %s, claimed_at = NOW()
+                WHERE ground_truth_id IN (
+                    SELECT ground_truth_id
+                    FROM labeling_queue lq
+                    WHERE (claimed_at IS NULL
+                           OR claimed_at < NOW() - %s * INTERVAL '1 minute')
+                      AND NOT EXISTS (
+                          SELECT 1 FROM signal_ground_truth l
+                          WHERE l.signal_id = lq.signal_id AND l.manual_label IS NOT NULL
+                      )
+                    ORDER BY uncertainty DESC, ground_truth_id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING ground_truth_id, signal_id, game_id,
+                          probability_rigged, uncertainty, model_version
+            """, (labeler, self.lease_minutes, limit), name='labeling_queue_next')
+            rows = cursor.fetchall()
+
+        rows.sort(key=lambda row: (-row['uncertainty'], row['ground_truth_id']))
+        return [
+            {
+                **row,
+                'probability_rigged': float(row['probability_rigged']),
+                'uncertainty': float(row['uncertainty'])
+            }
+            for row in rows
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the uncertainty-ranked labeling queue')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from ml_service import MLService
+
+    service = MLService()
+    service.labeling_queue.chunk_size = args.chunk_size
+    result = service.refresh_labeling_queue()
+    logger.info(f"Labeling queue result: {result}")
+
+
+if __name__ == '__main__':
+    main()
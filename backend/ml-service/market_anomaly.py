@@ -0,0 +1,408 @@
+"""
+Streaming Market Anomaly Scorer
+Scores Polymarket trades (pm_trades) in block_timestamp order with per-market
+online statistics, as a live tail or as a vectorized historical backfill
+
+Usage:
+    python market_anomaly.py backfill [--markets 12 15]
+    python market_anomaly.py tail [--interval 5]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.signal import lfilter
+import psycopg2
+from psycopg2.extras import execute_values
+
+# Shared Python modules live in backend/shared (also needed when run as a script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from pg_pool import PostgresPool
+
+logger = logging.getLogger(__name__)
+
+ALPHA = 0.05          # EWMA smoothing factor for price and size statistics
+WINDOW = 50           # trades in the order-flow imbalance window
+WARMUP_TRADES = 10    # trades per market before scores are emitted
+Z_SCALE = 3.0         # z-score at which a component reaches ~63% of its weight
+EPS = 1e-9
+ANOMALY_THRESHOLD = 0.75
+BUCKET_SECONDS = 60
+
+# Component weights: price deviation, volume spike, one-sided order flow
+WEIGHTS = (0.45, 0.30, 0.25)
+
+
+def combine_scores(price_z, volume_z, imbalance, trade_number):
+    """Anomaly score in [0, 1) from the three components (scalar or array)"""
+    score = (
+        WEIGHTS[0] * (1.0 - np.exp(-np.asarray(price_z) / Z_SCALE)) +
+        WEIGHTS[1] * (1.0 - np.exp(-np.asarray(volume_z) / Z_SCALE)) +
+        WEIGHTS[2] * np.asarray(imbalance)
+    )
+    score = np.where(np.asarray(trade_number) < WARMUP_TRADES, 0.0, score)
+    return np.minimum(score, 0.9999)
+
+
+class MarketState:
+    """
+    Online statistics for one market: EWMA mean/variance of YES price and
+    trade size, and ring buffers of signed and absolute size for the
+    order-flow imbalance window
+    """
+
+    __slots__ = ('price_mean', 'price_var', 'size_mean', 'size_var', 'count',
+                 'flow_ring', 'size_ring', 'position')
+
+    def __init__(self, window: int = WINDOW):
+        self.price_mean = 0.0
+        self.price_var = 0.0
+        self.size_mean = 0.0
+        self.size_var = 0.0
+        self.count = 0
+        self.flow_ring = np.zeros(window)
+        self.size_ring = np.zeros(window)
+        self.position = 0
+
+    def update(self, price: float, size: float, flow: float) -> Tuple[float, float, float, int]:
+        """Score one trade against the current state, then fold it in"""
+        if self.count == 0:
+            self.price_mean = price
+            self.size_mean = size
+
+        price_delta = price - self.price_mean
+        size_delta = size - self.size_mean
+        price_z = abs(price_delta) / np.sqrt(self.price_var + EPS)
+        volume_z = max(size_delta, 0.0) / np.sqrt(self.size_var + EPS)
+
+        self.price_mean += ALPHA * price_delta
+        self.price_var = (1 - ALPHA) * (self.price_var + ALPHA * price_delta * price_delta)
+        self.size_mean += ALPHA * size_delta
+        self.size_var = (1 - ALPHA) * (self.size_var + ALPHA * size_delta * size_delta)
+
+        self.flow_ring[self.position] = flow
+        self.size_ring[self.position] = size
+        self.position = (self.position + 1) % len(self.flow_ring)
+
+        trade_number = self.count
+        self.count += 1
+
+        total_size = self.size_ring.sum()
+        imbalance = abs(self.flow_ring.sum()) / total_size if total_size > 0 else 0.0
+
+        return price_z, volume_z, imbalance, trade_number
+
+    def history(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ring contents, oldest first (at most window - 1 previous trades)"""
+        window = len(self.flow_ring)
+        filled = min(self.count, window - 1)
+        order = (self.position - filled + np.arange(filled)) % window
+        return self.flow_ring[order], self.size_ring[order]
+
+    def update_many(self, prices: np.ndarray, sizes: np.ndarray,
+                    flows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized equivalent of calling update() for each trade in order.
+        The EWMA recurrences run as first-order IIR filters seeded with the
+        current state, so chunks can be processed back to back.
+        """
+        if self.count == 0:
+            self.price_mean = prices[0]
+            self.size_mean = sizes[0]
+
+        decay = [1, -(1 - ALPHA)]
+
+        price_mean_after = lfilter([ALPHA], decay, prices, zi=[(1 - ALPHA) * self.price_mean])[0]
+        price_delta = prices - np.concatenate([[self.price_mean], price_mean_after[:-1]])
+        price_var_after = lfilter([(1 - ALPHA) * ALPHA], decay, price_delta ** 2,
+                                  zi=[(1 - ALPHA) * self.price_var])[0]
+        price_var_before = np.concatenate([[self.price_var], price_var_after[:-1]])
+
+        size_mean_after = lfilter([ALPHA], decay, sizes, zi=[(1 - ALPHA) * self.size_mean])[0]
+        size_delta = sizes - np.concatenate([[self.size_mean], size_mean_after[:-1]])
+        size_var_after = lfilter([(1 - ALPHA) * ALPHA], decay, size_delta ** 2,
+                                 zi=[(1 - ALPHA) * self.size_var])[0]
+        size_var_before = np.concatenate([[self.size_var], size_var_after[:-1]])
+
+        price_z = np.abs(price_delta) / np.sqrt(price_var_before + EPS)
+        volume_z = np.maximum(size_delta, 0.0) / np.sqrt(size_var_before + EPS)
+
+        # Rolling window sums over ring history + this chunk via cumulative sums
+        flow_history, size_history = self.history()
+        all_flows = np.concatenate([flow_history, flows])
+        all_sizes = np.concatenate([size_history, sizes])
+        window = len(self.flow_ring)
+        ends = np.arange(len(flow_history) + 1, len(all_flows) + 1)
+        starts = np.maximum(ends - window, 0)
+        flow_cumsum = np.concatenate([[0.0], np.cumsum(all_flows)])
+        size_cumsum = np.concatenate([[0.0], np.cumsum(all_sizes)])
+        window_flow = flow_cumsum[ends] - flow_cumsum[starts]
+        window_size = size_cumsum[ends] - size_cumsum[starts]
+        imbalance = np.divide(np.abs(window_flow), window_size,
+                              out=np.zeros_like(window_size), where=window_size > 0)
+
+        trade_numbers = self.count + np.arange(len(prices))
+
+        # Carry state forward
+        self.price_mean = float(price_mean_after[-1])
+        self.price_var = float(price_var_after[-1])
+        self.size_mean = float(size_mean_after[-1])
+        self.size_var = float(size_var_after[-1])
+        self.count += len(prices)
+        tail = min(window, len(all_flows))
+        self.flow_ring[:] = 0.0
+        self.size_ring[:] = 0.0
+        self.flow_ring[:tail] = all_flows[-tail:]
+        self.size_ring[:tail] = all_sizes[-tail:]
+        self.position = tail % window
+
+        return price_z, volume_z, imbalance, trade_numbers
+
+
+class MarketAnomalyScorer:
+    """
+    Scores pm_trades into pm_market_anomalies, one row per market per
+    BUCKET_SECONDS bucket holding the bucket's peak score
+    """
+
+    TRADE_COLUMNS = "id, market_id, block_timestamp, price, size, side, outcome"
+
+    def __init__(self, db: PostgresPool, chunk_size: int = 100000):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.states: Dict[int, MarketState] = {}
+
+    @staticmethod
+    def _normalize(rows: List[tuple]) -> Tuple[np.ndarray, ...]:
+        """YES-denominated price, size, and signed size (+ buys YES pressure)"""
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        timestamps = np.array([row[2].replace(tzinfo=timezone.utc).timestamp() for row in rows])
+        prices = np.array([float(row[3]) for row in rows])
+        sizes = np.array([float(row[4]) for row in rows])
+        is_no = np.array([row[6] == 'NO' for row in rows])
+        is_buy = np.array([row[5] == 'BUY' for row in rows])
+
+        yes_prices = np.where(is_no, 1.0 - prices, prices)
+        flows = np.where(is_buy != is_no, sizes, -sizes)
+        return ids, timestamps, yes_prices, sizes, flows
+
+    def backfill(self, market_ids: Optional[List[int]] = None) -> int:
+        """Rescore the full history of each market with vectorized passes"""
+        if market_ids is None:
+            with self.db.cursor() as cursor:
+                self.db.execute(cursor, "SELECT DISTINCT market_id FROM pm_trades ORDER BY market_id",
+                                name='anomaly_markets')
+                market_ids = [row[0] for row in cursor.fetchall()]
+
+        scored = 0
+        for market_id in market_ids:
+            scored += self._backfill_market(market_id)
+
+        logger.info(f"Backfill scored {scored} trades across {len(market_ids)} markets")
+        return scored
+
+    def _backfill_market(self, market_id: int) -> int:
+        state = MarketState()
+        scored = 0
+
+        # Reads and writes use separate connections: the server-side read
+        # cursor lives in one transaction, while the writer commits per chunk.
+        # The read connection is opened outside the pool (as backfill.py
+        # workers do), so one backfill never holds two pool slots at once.
+        read_conn = psycopg2.connect(**self.db.db_config)
+        try:
+            with self.db.connection() as write_conn:
+                cursor = write_conn.cursor()
+                trades = read_conn.cursor(name=f"anomaly_backfill_{market_id}")
+                try:
+                    self.db.execute(cursor, "DELETE FROM pm_market_anomalies WHERE market_id = %s",
+                                    (market_id,), name='anomaly_reset_market')
+
+                    # Server-side cursor streams the market's history in chunks
+                    trades.itersize = self.chunk_size
+                    self.db.execute(trades, f"""
+                        SELECT {self.TRADE_COLUMNS}
+                        FROM pm_trades
+                        WHERE market_id = %s
+                        ORDER BY block_timestamp, id
+                    """, (market_id,), name='anomaly_backfill')
+
+                    while True:
+                        rows = trades.fetchmany(self.chunk_size)
+                        if not rows:
+                            break
+
+                        ids, timestamps, prices, sizes, flows = self._normalize(rows)
+                        price_z, volume_z, imbalance, trade_numbers = state.update_many(prices, sizes, flows)
+                        scores = combine_scores(price_z, volume_z, imbalance, trade_numbers)
+                        self._write(cursor, np.full(len(ids), market_id), ids, timestamps,
+                                    scores, price_z, volume_z, imbalance)
+                        scored += len(rows)
+
+                finally:
+                    trades.close()
+                    cursor.close()
+        finally:
+            read_conn.close()
+
+        self.states[market_id] = state
+        return scored
+
+    def tail(self, poll_interval: float = 5.0, batch_size: int = 5000):
+        """
+        Score newly indexed trades as they arrive. Trades are taken in id
+        order, so the watermark never passes a trade the indexer inserted
+        out of block order.
+        """
+        last_id = self._watermark()
+        self._warm_up(last_id)
+        logger.info(f"Tailing pm_trades after id {last_id}")
+
+        while True:
+            with self.db.cursor() as cursor:
+                self.db.execute(cursor, f"""
+                    SELECT {self.TRADE_COLUMNS}
+                    FROM pm_trades
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, batch_size), name='anomaly_tail')
+                rows = cursor.fetchall()
+
+                if rows:
+                    self._score_stream(cursor, rows)
+                    last_id = rows[-1][0]
+
+            if len(rows) < batch_size:
+                time.sleep(poll_interval)
+
+    def _score_stream(self, cursor, rows: List[tuple]):
+        ids, timestamps, prices, sizes, flows = self._normalize(rows)
+        market_ids = np.array([row[1] for row in rows], dtype=np.int64)
+        components = np.zeros((len(rows), 4))
+
+        for i, market_id in enumerate(market_ids.tolist()):
+            state = self.states.get(market_id)
+            if state is None:
+                state = self.states[market_id] = MarketState()
+            components[i] = state.update(prices[i], sizes[i], flows[i])
+
+        price_z, volume_z, imbalance, trade_numbers = components.T
+        scores = combine_scores(price_z, volume_z, imbalance, trade_numbers)
+        self._write(cursor, market_ids, ids, timestamps, scores, price_z, volume_z, imbalance)
+
+    def _watermark(self) -> int:
+        with self.db.cursor() as cursor:
+            self.db.execute(cursor, "SELECT COALESCE(MAX(last_trade_id), 0) FROM pm_market_anomalies",
+                            name='anomaly_watermark')
+            return cursor.fetchone()[0]
+
+    def _warm_up(self, last_id: int):
+        """
+        Replay each market's most recent trades to rebuild online state.
+        One backward scan of idx_pm_trades_market_time per market, instead
+        of ranking all of pm_trades.
+        """
+        with self.db.cursor() as cursor:
+            self.db.execute(cursor, f"""
+                SELECT {self.TRADE_COLUMNS}
+                FROM markets m
+                CROSS JOIN LATERAL (
+                    SELECT {self.TRADE_COLUMNS}
+                    FROM pm_trades t
+                    WHERE t.market_id = m.id AND t.id <= %s
+                    ORDER BY t.block_timestamp DESC, t.id DESC
+                    LIMIT %s
+                ) recent
+                ORDER BY market_id, block_timestamp, id
+            """, (last_id, int(4 / ALPHA)), name='anomaly_warm_up')
+            rows = cursor.fetchall()
+
+        if not rows:
+            return
+
+        ids, timestamps, prices, sizes, flows = self._normalize(rows)
+        market_ids = np.array([row[1] for row in rows], dtype=np.int64)
+        for market_id in np.unique(market_ids).tolist():
+            mask = market_ids == market_id
+            state = self.states[market_id] = MarketState()
+            state.update_many(prices[mask], sizes[mask], flows[mask])
+
+    def _write(self, cursor, market_ids, ids, timestamps, scores, price_z, volume_z, imbalance):
+        """Aggregate trades to (market, bucket) peaks and upsert in bulk"""
+        buckets = (timestamps // BUCKET_SECONDS).astype(np.int64)
+        keys = np.stack([market_ids, buckets], axis=1)
+        unique_keys, group = np.unique(keys, axis=0, return_inverse=True)
+        group = group.ravel()
+
+        n = len(unique_keys)
+        peak = np.full(n, -1.0)
+        np.maximum.at(peak, group, scores)
+        is_peak = scores == peak[group]
+        peak_row = np.full(n, -1, dtype=np.int64)
+        peak_row[group[is_peak]] = np.flatnonzero(is_peak)
+        counts = np.bincount(group, minlength=n)
+        last_ids = np.zeros(n, dtype=np.int64)
+        np.maximum.at(last_ids, group, ids)
+
+        values = [
+            (
+                int(market_id),
+                datetime.utcfromtimestamp(int(bucket) * BUCKET_SECONDS),
+                round(float(peak[i]), 4),
+                bool(peak[i] >= ANOMALY_THRESHOLD),
+                round(float(min(price_z[peak_row[i]], 999999)), 4),
+                round(float(min(volume_z[peak_row[i]], 999999)), 4),
+                round(float(imbalance[peak_row[i]]), 4),
+                int(counts[i]),
+                int(last_ids[i])
+            )
+            for i, (market_id, bucket) in enumerate(unique_keys)
+        ]
+
+        with self.db.timed('anomaly_write'):
+            execute_values(cursor, """
+                INSERT INTO pm_market_anomalies (
+                    market_id, bucket_start, anomaly_score, anomaly_detected,
+                    price_z, volume_z, flow_imbalance, trade_count, last_trade_id
+                ) VALUES %s
+                ON CONFLICT (market_id, bucket_start) DO UPDATE SET
+                    anomaly_score = GREATEST(pm_market_anomalies.anomaly_score, EXCLUDED.anomaly_score),
+                    anomaly_detected = pm_market_anomalies.anomaly_detected OR EXCLUDED.anomaly_detected,
+                    price_z = CASE WHEN EXCLUDED.anomaly_score > pm_market_anomalies.anomaly_score
+                                   THEN EXCLUDED.price_z ELSE pm_market_anomalies.price_z END,
+                    volume_z = CASE WHEN EXCLUDED.anomaly_score > pm_market_anomalies.anomaly_score
+                                    THEN EXCLUDED.volume_z ELSE pm_market_anomalies.volume_z END,
+                    flow_imbalance = CASE WHEN EXCLUDED.anomaly_score > pm_market_anomalies.anomaly_score
+                                          THEN EXCLUDED.flow_imbalance ELSE pm_market_anomalies.flow_imbalance END,
+                    trade_count = pm_market_anomalies.trade_count + EXCLUDED.trade_count,
+                    last_trade_id = GREATEST(pm_market_anomalies.last_trade_id, EXCLUDED.last_trade_id),
+                    updated_at = NOW()
+            """, values, page_size=1000)
+            cursor.connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score pm_trades for market anomalies')
+    parser.add_argument('mode', choices=['backfill', 'tail'])
+    parser.add_argument('--markets', type=int, nargs='+')
+    parser.add_argument('--interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    from ml_service import MLService
+
+    scorer = MarketAnomalyScorer(MLService().db)
+    if args.mode == 'backfill':
+        scorer.backfill(args.markets)
+    else:
+        scorer.tail(args.interval)
+
+
+if __name__ == '__main__':
+    main()
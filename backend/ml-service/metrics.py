@@ -0,0 +1,85 @@
+"""
+Prometheus Metrics for ML Service
+Latency histograms for the hot paths, exported at /metrics
+"""
+
+from prometheus_client import Histogram, Counter, Gauge, CONTENT_TYPE_LATEST, generate_latest
+
+# Sub-millisecond resolution for single predictions, up to a few seconds for cold paths
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+PREDICT_SECONDS = Histogram(
+    'ml_predict_seconds',
+    'Time spent scoring a prediction request',
+    ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+
+BATCH_SIZE = Histogram(
+    'ml_batch_size',
+    'Number of signals per batch prediction request',
+    buckets=SIZE_BUCKETS
+)
+
+TRAIN_SECONDS = Histogram(
+    'ml_train_seconds',
+    'Model training duration',
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+
+MODEL_LOAD_SECONDS = Histogram(
+    'ml_model_load_seconds',
+    'Time spent loading a model artifact from disk',
+    buckets=LATENCY_BUCKETS
+)
+
+DB_QUERY_SECONDS = Histogram(
+    'ml_db_query_seconds',
+    'Database query time by query name',
+    ['query'],
+    buckets=LATENCY_BUCKETS
+)
+
+MICROBATCH_SIZE = Histogram(
+    'ml_microbatch_size',
+    'Number of coalesced single predictions per forest call',
+    buckets=SIZE_BUCKETS
+)
+
+BATCHER_QUEUE_DEPTH = Gauge(
+    'ml_batcher_queue_depth',
+    'Predictions waiting in the micro-batching queue'
+)
+
+PREDICTION_ERRORS = Counter(
+    'ml_prediction_errors_total',
+    'Prediction requests that failed'
+)
+
+DRIFT_PSI = Gauge(
+    'ml_drift_psi',
+    'Population Stability Index of served traffic against the training reference',
+    ['feature']
+)
+
+RESIDENT_MODEL_BYTES = Gauge(
+    'ml_resident_model_bytes',
+    'Memory held by non-active model versions in the LRU registry'
+)
+
+SHADOW_PREDICTIONS = Counter(
+    'ml_shadow_predictions_total',
+    'Rows scored by the shadow challenger, by agreement with the active model',
+    ['agreement']
+)
+
+
+def observe_db_query(name: str, seconds: float):
+    """PostgresPool observer feeding DB_QUERY_SECONDS"""
+    DB_QUERY_SECONDS.labels(name).observe(seconds)
+
+
+def render():
+    """Return (body, content_type) in the Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -4,14 +4,15 @@ Trains and evaluates models on game rigging signals
 """
 
 import os
+import sys
 import json
+import time
 import pickle
 import logging
 from datetime import datetime
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 import numpy as np
 import pandas as pd
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
@@ -20,20 +21,83 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 import joblib
 from dotenv import load_dotenv
 
+# Shared Python modules live in backend/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from pg_pool import get_pool
+from feature_store import FeatureStore
+from labeling_queue import LabelingQueue
+import metrics as ml_metrics
+import tuning
+from explain import TreeExplainer
+import drift
+from model_registry import ModelRegistry, ModelNotFoundError, ShadowScorer
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+
+def fold_scaler_into_forest(forest: RandomForestClassifier,
+                            scaler: StandardScaler) -> RandomForestClassifier:
+    """
+    Map every split threshold of a forest trained on scaled features back
+    into raw feature space, so the forest accepts raw features directly.
+    Only used for legacy artifacts: predict casts inputs to float32, so a
+    raw value lying exactly on a mapped threshold can fall on the other
+    side of the split. Retraining gives an exact raw-feature artifact.
+    """
+    scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        internal = tree.feature >= 0  # leaves are marked with feature -2
+        feature = tree.feature[internal]
+        thresholds = tree.threshold  # view onto the tree's node storage
+        thresholds[internal] = thresholds[internal] * scale[feature] + mean[feature]
+
+    forest.scaler_folded_ = True
+    return forest
+
+
+def load_model_artifact(model_path: str) -> RandomForestClassifier:
+    """
+    Load a saved forest. Forests trained on raw features carry
+    raw_features_ and load as is. Legacy artifacts trained on scaled
+    features have a separate scaler_v<id>.pkl next to them, which is
+    folded in on load.
+    """
+    model = joblib.load(model_path)
+
+    if not (getattr(model, 'raw_features_', False) or getattr(model, 'scaler_folded_', False)):
+        scaler_path = model_path.replace('random_forest', 'scaler')
+        if scaler_path != model_path and os.path.exists(scaler_path):
+            logger.warning(f"Folding legacy scaler into {model_path}; retrain for an exact artifact")
+            fold_scaler_into_forest(model, joblib.load(scaler_path))
+
+    return model
+
+
 class MLService:
     """
     RandomForest-based ML service for signal classification
     """
 
+    DEFAULT_HYPERPARAMS = {
+        'n_estimators': 100,
+        'max_depth': 15,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2,
+        'class_weight': 'balanced'
+    }
+
     def __init__(self):
         self.model = None
-        self.scaler = StandardScaler()
         self.model_version = None
+        self._explainer = None
+        self.drift_monitor = None
         self.features = [
             'rigging_index',
             'anomaly_score',
@@ -49,39 +113,38 @@ class MLService:
             'user': os.getenv('DB_USER', 'admin'),
             'password': os.getenv('DB_PASSWORD', 'password')
         }
+        self.db = get_pool(self.db_config, maxconn=int(os.getenv('DB_POOL_SIZE', 10)))
+        self.db.prepare('latest_active_model', """
+            SELECT id, model_path, feature_reference FROM model_versions
+            WHERE is_active = TRUE
+            ORDER BY deployed_at DESC
+            LIMIT 1
+        """)
+        self.db.add_observer(ml_metrics.observe_db_query)
+        self.feature_store = FeatureStore(self.db)
+        self.labeling_queue = LabelingQueue(self.db)
+
+        # Non-active versions requested by model_version, and an optional
+        # challenger shadowing every served batch
+        self.registry = ModelRegistry(
+            self.db, load_model_artifact,
+            max_bytes=int(os.getenv('ML_MODEL_CACHE_MB', 512)) * 1024 * 1024
+        )
+        shadow_version = os.getenv('ML_SHADOW_VERSION')
+        self.shadow = ShadowScorer(self.registry, int(shadow_version)) if shadow_version else None
 
     def load_training_data(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
-        Load labeled signals from signal_ground_truth table
+        Load labeled signals from the signal_features store
         """
         try:
-            conn = psycopg2.connect(**self.db_config)
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            self.feature_store.refresh()
+            df = self.feature_store.load_labeled()
 
-            query = """
-            SELECT
-                sgt.rigging_index,
-                sgt.anomaly_score,
-                COALESCE(td.tweet_count, 0) as tweet_count,
-                COALESCE(td.avg_sentiment, 0) as avg_sentiment,
-                EXTRACT(HOUR FROM sgt.timestamp)::int as hour_of_day,
-                EXTRACT(DOW FROM sgt.timestamp)::int as day_of_week,
-                sgt.manual_label as label
-            FROM signal_ground_truth sgt
-            LEFT JOIN twitter_data td ON sgt.game_id = td.game_id
-            WHERE sgt.manual_label IS NOT NULL
-            ORDER BY sgt.labeled_at DESC
-            """
-
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            conn.close()
-
-            if not rows:
+            if df is None:
                 logger.warning("No labeled data found in database")
                 return None, None
 
-            df = pd.DataFrame(rows)
             X = df[self.features]
             y = df['label'].astype(int)
 
@@ -98,6 +161,7 @@ class MLService:
         """
         Train RandomForest classifier on labeled signals
         """
+        start = time.perf_counter()
         try:
             X, y = self.load_training_data()
 
@@ -112,26 +176,24 @@ class MLService:
                 X, y, test_size=test_size, random_state=random_state, stratify=y
             )
 
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
-
-            # Train RandomForest
-            self.model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=15,
-                min_samples_split=5,
-                min_samples_leaf=2,
+            # Train RandomForest on raw features: splits are invariant to
+            # per-feature scaling, and the evaluated forest is the one saved.
+            # Built locally so concurrent predictions never see it unfitted.
+            model = RandomForestClassifier(
+                **self.DEFAULT_HYPERPARAMS,
                 random_state=random_state,
-                n_jobs=-1,
-                class_weight='balanced'
+                n_jobs=-1
             )
 
-            self.model.fit(X_train_scaled, y_train)
+            model.fit(X_train.values, y_train)
 
             # Evaluate
-            train_pred = self.model.predict(X_train_scaled)
-            test_pred = self.model.predict(X_test_scaled)
+            train_pred = model.predict(X_train.values)
+            test_pred = model.predict(X_test.values)
+
+            reference = drift.build_reference(
+                X_train.values, model.predict_proba(X_test.values)[:, 1], self.features
+            )
 
             metrics = {
                 'training_accuracy': float(accuracy_score(y_train, train_pred)),
@@ -145,7 +207,10 @@ class MLService:
             logger.info(f"Training complete. Metrics: {metrics}")
 
             # Save model version to database
-            self.model_version = self._save_model_version(metrics, len(X))
+            model_version = self._save_model_version(model, metrics, len(X), feature_reference=reference)
+            self.model = model
+            self.model_version = model_version
+            self._set_drift_reference(reference)
 
             return {
                 'success': True,
@@ -158,15 +223,281 @@ class MLService:
         except Exception as e:
             logger.error(f"Error training model: {e}")
             return {'success': False, 'error': str(e)}
+        finally:
+            ml_metrics.TRAIN_SECONDS.observe(time.perf_counter() - start)
+
+    def tune_model(self, search_space: Dict[str, List[Any]] = None, n_splits: int = 5,
+                   max_candidates: int = None, max_workers: int = None,
+                   random_state: int = 42) -> Dict[str, Any]:
+        """
+        Search hyperparameters on time-ordered CV folds, then train and
+        save the winner together with the full search record
+        """
+        start = time.perf_counter()
+        try:
+            X, y = self.load_training_data()
+
+            if X is None or y is None:
+                return {
+                    'success': False,
+                    'error': 'Insufficient labeled data for training'
+                }
+
+            ranked = tuning.search(
+                X.values, y.values,
+                search_space=search_space,
+                n_splits=n_splits,
+                max_candidates=max_candidates,
+                max_workers=max_workers,
+                random_state=random_state
+            )
+            winner = ranked[0]
+
+            # The search ran on raw features, so the winner needs no scaler
+            model = RandomForestClassifier(
+                **winner['params'],
+                random_state=random_state,
+                n_jobs=-1
+            )
+            model.fit(X.values, y)
+            train_pred = model.predict(X.values)
+
+            metrics = {
+                'training_accuracy': float(accuracy_score(y, train_pred)),
+                'training_precision': float(precision_score(y, train_pred, zero_division=0)),
+                'training_recall': float(recall_score(y, train_pred, zero_division=0)),
+                'training_f1_score': float(f1_score(y, train_pred, zero_division=0)),
+                'validation_accuracy': winner['mean_accuracy'],
+                'validation_f1_score': winner['mean_f1']
+            }
+
+            hyperparams = dict(winner['params'])
+            hyperparams['search'] = {
+                'n_splits': n_splits,
+                'cv': 'time_series_split',
+                'candidates': ranked
+            }
+
+            logger.info(f"Tuning complete. Winner: {winner}")
+
+            # No holdout here: the prediction reference is in-sample
+            reference = drift.build_reference(
+                X.values, model.predict_proba(X.values)[:, 1], self.features
+            )
+
+            model_version = self._save_model_version(model, metrics, len(X), hyperparams, reference)
+            self.model = model
+            self.model_version = model_version
+            self._set_drift_reference(reference)
+
+            return {
+                'success': True,
+                'model_version': self.model_version,
+                'metrics': metrics,
+                'hyperparameters': winner['params'],
+                'candidates_evaluated': len(ranked),
+                'top_candidates': ranked[:5]
+            }
+
+        except Exception as e:
+            logger.error(f"Error tuning model: {e}")
+            return {'success': False, 'error': str(e)}
+        finally:
+            ml_metrics.TRAIN_SECONDS.observe(time.perf_counter() - start)
+
+    def build_features(self, rigging_index: float, anomaly_score: float,
+                       tweet_count: int = 0, avg_sentiment: float = 0) -> List[float]:
+        """
+        Feature row in self.features order, temporal features from current time
+        """
+        now = datetime.utcnow()
+        return [
+            rigging_index,
+            anomaly_score,
+            tweet_count,
+            avg_sentiment,
+            now.hour,
+            now.weekday()
+        ]
 
     def predict(self, rigging_index: float, anomaly_score: float,
-                tweet_count: int = 0, avg_sentiment: float = 0) -> Dict[str, Any]:
+                tweet_count: int = 0, avg_sentiment: float = 0,
+                explain: bool = False, model_version: Optional[int] = None) -> Dict[str, Any]:
         """
         Predict label for a signal
         """
+        start = time.perf_counter()
+        try:
+            features = np.array([self.build_features(
+                rigging_index, anomaly_score, tweet_count, avg_sentiment
+            )])
+            return self.predict_batch(features, explain=explain, model_version=model_version)[0]
+
+        except Exception as e:
+            logger.error(f"Error making prediction: {e}")
+            ml_metrics.PREDICTION_ERRORS.inc()
+            return {'success': False, 'error': str(e)}
+        finally:
+            ml_metrics.PREDICT_SECONDS.labels('predict').observe(time.perf_counter() - start)
+
+    def predict_batch(self, features: np.ndarray, explain: bool = False,
+                      model_version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Predict labels for a feature matrix (rows in self.features order)
+        with a single forest call. explain=True adds per-feature
+        contributions to each result. model_version selects a non-active
+        version; the active model is used by default.
+        """
+        try:
+            model, version = self.resolve_model(model_version)
+        except ModelNotFoundError as e:
+            return [{'success': False, 'error': str(e)}] * len(features)
+
+        if model is None:
+            return [{
+                'success': False,
+                'error': 'No trained model available'
+            }] * len(features)
+
+        probabilities = model.predict_proba(features)
+        predictions = model.classes_[np.argmax(probabilities, axis=1)]
+        if version == self.model_version:
+            self._observe_served(features, probabilities[:, 1])
+
+        # Get feature importance
+        feature_importance = dict(zip(
+            self.features,
+            model.feature_importances_.tolist()
+        ))
+
+        results = [
+            {
+                'success': True,
+                'prediction': bool(prediction),  # True = rigged, False = normal
+                'confidence': float(max(probability)),
+                'probability_normal': float(probability[0]),
+                'probability_rigged': float(probability[1]),
+                'feature_importance': feature_importance,
+                'model_version': version
+            }
+            for prediction, probability in zip(predictions, probabilities)
+        ]
+
+        if explain:
+            explainer = self.get_explainer(version)
+            contributions = explainer.contributions(features)
+            for result, row in zip(results, contributions.tolist()):
+                result['explanation'] = {
+                    'bias': explainer.bias,
+                    'contributions': dict(zip(self.features, row))
+                }
+
+        return results
+
+    def resolve_model(self, model_version: Optional[int] = None) -> Tuple[Optional[RandomForestClassifier], Optional[int]]:
+        """
+        (model, version) to serve: the active model by default, otherwise
+        the requested version from the registry. Raises ModelNotFoundError
+        for unknown versions.
+        """
+        if model_version is not None and model_version != self.model_version:
+            return self.registry.get(int(model_version)), int(model_version)
+
+        if self.model is None:
+            # Try to load from disk
+            self._load_latest_model()
+
+        return self.model, self.model_version
+
+    def get_explainer(self, model_version: Optional[int] = None) -> TreeExplainer:
+        """
+        Tree-path explainer for the active model (or a registry version),
+        built on first use
+        """
+        if model_version is not None and model_version != self.model_version:
+            return self.registry.explainer(model_version)
+
+        if self._explainer is None or self._explainer.model is not self.model:
+            self._explainer = TreeExplainer(self.model)
+        return self._explainer
+
+    def score_inputs(self, inputs: np.ndarray, model_version: Optional[int] = None) -> np.ndarray:
+        """
+        Rigged-class probability for a matrix of request inputs
+        (rigging_index, anomaly_score, tweet_count, avg_sentiment);
+        temporal features are taken from the current time
+        """
+        model, version = self.resolve_model(model_version)
+        now = datetime.utcnow()
+        temporal = np.tile([now.hour, now.weekday()], (len(inputs), 1))
+        features = np.hstack([inputs, temporal])
+        rigged = model.predict_proba(features)[:, 1]
+        if version == self.model_version:
+            self._observe_served(features, rigged)
+        return rigged
+
+    def predict_signals(self, signal_ids: List[int], model_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Score stored signals using their precomputed feature rows. The store
+        is not refreshed here (see /api/ml/features/refresh); signals without
+        a feature row yet are listed under 'missing'.
+        """
+        start = time.perf_counter()
+        ml_metrics.BATCH_SIZE.observe(len(signal_ids))
+        try:
+            model, version = self.resolve_model(model_version)
+
+            if model is None:
+                return {
+                    'success': False,
+                    'error': 'No trained model available'
+                }
+
+            df = self.feature_store.load_features(signal_ids)
+
+            if df is None:
+                return {'success': True, 'predictions': [], 'count': 0, 'missing': list(signal_ids)}
+
+            features = df[self.features].values
+            rigged = model.predict_proba(features)[:, 1]
+            if version == self.model_version:
+                self._observe_served(features, rigged)
+
+            predictions = [
+                {
+                    'signal_id': int(signal_id),
+                    'prediction': bool(p > 0.5),
+                    'confidence': float(max(p, 1.0 - p)),
+                    'probability_normal': float(1.0 - p),
+                    'probability_rigged': float(p)
+                }
+                for signal_id, p in zip(df['signal_id'], rigged)
+            ]
+            found = set(df['signal_id'].tolist())
+
+            return {
+                'success': True,
+                'predictions': predictions,
+                'count': len(predictions),
+                'missing': [signal_id for signal_id in signal_ids if signal_id not in found],
+                'model_version': version
+            }
+
+        except ModelNotFoundError:
+            raise
+        except Exception as e:
+            logger.error(f"Error scoring signals: {e}")
+            ml_metrics.PREDICTION_ERRORS.inc()
+            return {'success': False, 'error': str(e)}
+        finally:
+            ml_metrics.PREDICT_SECONDS.labels('predict_signals').observe(time.perf_counter() - start)
+
+    def refresh_labeling_queue(self) -> Dict[str, Any]:
+        """
+        Re-rank unlabeled signals for validators with the active model
+        """
         try:
             if self.model is None:
-                # Try to load from disk
                 self._load_latest_model()
 
             if self.model is None:
@@ -175,105 +506,116 @@ class MLService:
                     'error': 'No trained model available'
                 }
 
-            # Get temporal features from current time
-            from datetime import datetime
-            now = datetime.utcnow()
-            hour_of_day = now.hour
-            day_of_week = now.weekday()
-
-            # Create feature vector
-            features = np.array([[
-                rigging_index,
-                anomaly_score,
-                tweet_count,
-                avg_sentiment,
-                hour_of_day,
-                day_of_week
-            ]])
-
-            features_scaled = self.scaler.transform(features)
-
-            prediction = self.model.predict(features_scaled)[0]
-            probability = self.model.predict_proba(features_scaled)[0]
-            confidence = float(max(probability))
-
-            # Get feature importance
-            feature_importance = dict(zip(
-                self.features,
-                self.model.feature_importances_.tolist()
-            ))
+            self.feature_store.refresh()
+            result = self.labeling_queue.refresh(self.model, self.model_version)
 
             return {
                 'success': True,
-                'prediction': bool(prediction),  # True = rigged, False = normal
-                'confidence': confidence,
-                'probability_normal': float(probability[0]),
-                'probability_rigged': float(probability[1]),
-                'feature_importance': feature_importance,
-                'model_version': self.model_version
+                'model_version': self.model_version,
+                **result
             }
 
         except Exception as e:
-            logger.error(f"Error making prediction: {e}")
+            logger.error(f"Error refreshing labeling queue: {e}")
             return {'success': False, 'error': str(e)}
 
-    def _save_model_version(self, metrics: Dict, training_samples: int) -> int:
+    def _set_drift_reference(self, reference: Dict[str, Any]):
+        """Start a fresh drift monitor for the serving model's reference"""
+        if reference:
+            self.drift_monitor = drift.DriftMonitor(
+                reference, half_life=int(os.getenv('DRIFT_HALF_LIFE', 10000))
+            )
+        else:
+            self.drift_monitor = None
+
+    def _observe_served(self, features: np.ndarray, rigged: np.ndarray):
+        """Feed active-model traffic to the drift monitor and shadow challenger"""
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe(features, rigged)
+        if self.shadow is not None and self.shadow.version != self.model_version:
+            self.shadow.submit(features, rigged)
+
+    def check_drift(self, retrain: bool = False, min_observations: int = 500) -> Dict[str, Any]:
+        """
+        Drift scores of served traffic against the model's training
+        reference; retrain=True retrains when drift is detected
+        """
+        if self.model is None:
+            self._load_latest_model()
+
+        if self.drift_monitor is None:
+            return {
+                'success': False,
+                'error': 'No drift reference for the active model'
+            }
+
+        status = self.drift_monitor.status(min_observations)
+        for name, score in status['psi'].items():
+            ml_metrics.DRIFT_PSI.labels(name).set(score)
+
+        result = {
+            'success': True,
+            'model_version': self.model_version,
+            **status
+        }
+
+        if retrain and status['status'] == 'drift':
+            logger.warning(f"Drift detected in {status['drifted']}, retraining")
+            result['retrain'] = self.train_model()
+
+        return result
+
+    def _save_model_version(self, model: RandomForestClassifier, metrics: Dict,
+                            training_samples: int,
+                            hyperparams: Dict[str, Any] = None,
+                            feature_reference: Dict[str, Any] = None) -> int:
         """
         Save model version to database
         """
         try:
-            conn = psycopg2.connect(**self.db_config)
-            cursor = conn.cursor()
-
             query = """
             INSERT INTO model_versions (
                 model_name, model_type, version_number,
                 training_data_count,
                 training_accuracy, training_precision, training_recall, training_f1_score,
                 validation_accuracy, validation_f1_score,
-                hyperparameters, feature_list, is_active, deployed_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                hyperparameters, feature_list, feature_reference, is_active, deployed_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
             RETURNING id
             """
 
-            hyperparams = {
-                'n_estimators': 100,
-                'max_depth': 15,
-                'min_samples_split': 5,
-                'min_samples_leaf': 2,
-                'class_weight': 'balanced'
-            }
-
-            cursor.execute(query, (
-                'random_forest_rigging_detector',
-                'random_forest',
-                1,
-                training_samples,
-                metrics['training_accuracy'],
-                metrics['training_precision'],
-                metrics['training_recall'],
-                metrics['training_f1_score'],
-                metrics['validation_accuracy'],
-                metrics['validation_f1_score'],
-                json.dumps(hyperparams),
-                json.dumps(self.features),
-                True
-            ))
-
-            model_id = cursor.fetchone()[0]
-            conn.commit()
-
-            # Save model to disk
-            model_path = f'/models/random_forest_v{model_id}.pkl'
-            os.makedirs('/models', exist_ok=True)
-            joblib.dump(self.model, model_path)
-            joblib.dump(self.scaler, f'/models/scaler_v{model_id}.pkl')
-
-            # Update model_path in database
-            update_query = "UPDATE model_versions SET model_path = %s WHERE id = %s"
-            cursor.execute(update_query, (model_path, model_id))
-            conn.commit()
-            conn.close()
+            if hyperparams is None:
+                hyperparams = self.DEFAULT_HYPERPARAMS
+
+            with self.db.cursor() as cursor:
+                self.db.execute(cursor, query, (
+                    'random_forest_rigging_detector',
+                    'random_forest',
+                    1,
+                    training_samples,
+                    metrics['training_accuracy'],
+                    metrics['training_precision'],
+                    metrics['training_recall'],
+                    metrics['training_f1_score'],
+                    metrics['validation_accuracy'],
+                    metrics['validation_f1_score'],
+                    json.dumps(hyperparams),
+                    json.dumps(self.features),
+                    json.dumps(feature_reference) if feature_reference else None,
+                    True
+                ), name='insert_model_version')
+                model_id = cursor.fetchone()[0]
+
+                # Save model to disk
+                model_path = f'/models/random_forest_v{model_id}.pkl'
+                os.makedirs('/models', exist_ok=True)
+                # Marks the artifact as needing no scaler when loaded
+                model.raw_features_ = True
+                joblib.dump(model, model_path)
+
+                # Update model_path in database
+                update_query = "UPDATE model_versions SET model_path = %s WHERE id = %s"
+                self.db.execute(cursor, update_query, (model_path, model_id), name='update_model_path')
 
             logger.info(f"Model version {model_id} saved successfully")
             return model_id
@@ -287,26 +629,15 @@ class MLService:
         Load the latest active model from database
         """
         try:
-            conn = psycopg2.connect(**self.db_config)
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-            query = """
-            SELECT id, model_path FROM model_versions
-            WHERE is_active = TRUE
-            ORDER BY deployed_at DESC
-            LIMIT 1
-            """
-
-            cursor.execute(query)
-            result = cursor.fetchone()
-            conn.close()
+            with self.db.cursor(cursor_factory=RealDictCursor) as cursor:
+                self.db.execute_prepared(cursor, 'latest_active_model')
+                result = cursor.fetchone()
 
             if result and result['model_path'] and os.path.exists(result['model_path']):
-                self.model = joblib.load(result['model_path'])
-                scaler_path = result['model_path'].replace('random_forest', 'scaler')
-                if os.path.exists(scaler_path):
-                    self.scaler = joblib.load(scaler_path)
+                with ml_metrics.MODEL_LOAD_SECONDS.time():
+                    self.model = load_model_artifact(result['model_path'])
                 self.model_version = result['id']
+                self._set_drift_reference(result['feature_reference'])
                 logger.info(f"Loaded model version {self.model_version}")
             else:
                 logger.warning("No active model found in database")
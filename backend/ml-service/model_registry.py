@@ -0,0 +1,189 @@
+"""
+Multi-Version Model Serving
+LRU set of resident model versions and shadow scoring of a challenger
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from pg_pool import PostgresPool
+from explain import TreeExplainer
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotFoundError(LookupError):
+    """Raised when a requested model version has no loadable artifact"""
+    pass
+
+
+def model_nbytes(model: RandomForestClassifier) -> int:
+    """Resident size of a forest: node and value arrays of every tree"""
+    total = 0
+    for estimator in model.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+class ModelRegistry:
+    """
+    Lazily loads model versions from model_versions.model_path and keeps
+    them resident in LRU order until their combined size exceeds
+    max_bytes. The most recently used version is never evicted, so a
+    single oversized model still serves.
+    """
+
+    def __init__(self, db: PostgresPool, loader: Callable[[str], RandomForestClassifier],
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.db = db
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self._models: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[int, threading.Lock] = {}
+        self.db.prepare('model_version_path', "SELECT model_path FROM model_versions WHERE id = $1")
+
+    def get(self, version: int) -> RandomForestClassifier:
+        return self._entry(version)['model']
+
+    def explainer(self, version: int) -> TreeExplainer:
+        entry = self._entry(version)
+        if entry['explainer'] is None:
+            entry['explainer'] = TreeExplainer(entry['model'])
+        return entry['explainer']
+
+    def _entry(self, version: int) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._models.get(version)
+            if entry is not None:
+                self._models.move_to_end(version)
+                return entry
+            load_lock = self._load_locks.setdefault(version, threading.Lock())
+
+        # Concurrent requests for the same cold version load it once
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(version)
+            if entry is None:
+                entry = self._load(version)
+                with self._lock:
+                    self._models[version] = entry
+                    self._evict()
+                    self._load_locks.pop(version, None)
+            return entry
+
+    def _load(self, version: int) -> Dict[str, Any]:
+        with self.db.cursor() as cursor:
+            self.db.execute_prepared(cursor, 'model_version_path', (version,))
+            row = cursor.fetchone()
+
+        if row is None or not row[0]:
+            raise ModelNotFoundError(f"Model version {version} not found")
+
+        start = time.perf_counter()
+        try:
+            model = self.loader(row[0])
+        except FileNotFoundError:
+            raise ModelNotFoundError(f"Model artifact for version {version} is missing: {row[0]}")
+        metrics.MODEL_LOAD_SECONDS.observe(time.perf_counter() - start)
+
+        nbytes = model_nbytes(model)
+        logger.info(f"Loaded model version {version} ({nbytes / 1e6:.1f} MB)")
+        return {'model': model, 'nbytes': nbytes, 'explainer': None}
+
+    def _evict(self):
+        total = sum(entry['nbytes'] for entry in self._models.values())
+        while total > self.max_bytes and len(self._models) > 1:
+            version, entry = self._models.popitem(last=False)
+            total -= entry['nbytes']
+            logger.info(f"Evicted model version {version} from memory")
+        metrics.RESIDENT_MODEL_BYTES.set(total)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            resident = {version: entry['nbytes'] for version, entry in self._models.items()}
+        return {
+            'resident_versions': list(resident),
+            'resident_bytes': sum(resident.values()),
+            'max_bytes': self.max_bytes
+        }
+
+
+class ShadowScorer:
+    """
+    Scores served batches with a challenger version on a background
+    thread and accumulates agreement with the champion. Batches are
+    dropped rather than queued once max_pending are waiting, so shadow
+    work never backs up into request latency.
+    """
+
+    def __init__(self, registry: ModelRegistry, version: int, max_pending: int = 256):
+        self.registry = registry
+        self.version = version
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-scorer')
+        self._lock = threading.Lock()
+        self._stats = {
+            'rows': 0,
+            'agreements': 0,
+            'champion_rigged': 0,
+            'challenger_rigged': 0,
+            'abs_probability_diff_sum': 0.0,
+            'dropped_batches': 0,
+            'errors': 0
+        }
+
+    def submit(self, features: np.ndarray, champion_rigged: np.ndarray):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['dropped_batches'] += 1
+            return
+        self._executor.submit(self._score, features, champion_rigged)
+
+    def _score(self, features: np.ndarray, champion_rigged: np.ndarray):
+        try:
+            challenger = self.registry.get(self.version)
+            challenger_rigged = challenger.predict_proba(features)[:, 1]
+
+            champion_labels = champion_rigged > 0.5
+            challenger_labels = challenger_rigged > 0.5
+            agreements = int(np.sum(champion_labels == challenger_labels))
+
+            with self._lock:
+                self._stats['rows'] += len(features)
+                self._stats['agreements'] += agreements
+                self._stats['champion_rigged'] += int(champion_labels.sum())
+                self._stats['challenger_rigged'] += int(challenger_labels.sum())
+                self._stats['abs_probability_diff_sum'] += float(
+                    np.abs(champion_rigged - challenger_rigged).sum()
+                )
+
+            metrics.SHADOW_PREDICTIONS.labels('agree').inc(agreements)
+            metrics.SHADOW_PREDICTIONS.labels('disagree').inc(len(features) - agreements)
+        except Exception as e:
+            logger.error(f"Shadow scoring error for version {self.version}: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+
+        rows = stats.pop('rows')
+        diff_sum = stats.pop('abs_probability_diff_sum')
+        return {
+            'challenger_version': self.version,
+            'rows': rows,
+            'agreement_rate': stats['agreements'] / rows if rows else None,
+            'mean_abs_probability_diff': diff_sum / rows if rows else None,
+            **stats
+        }
@@ -0,0 +1,207 @@
+"""
+Bulk Scoring Payloads
+Columnar binary input and chunked streaming output for /api/ml/batch-predict
+
+Input (Content-Type):
+    application/json                     {"signals": [{...}, ...]}
+    application/x-npy                    float matrix, one row per signal,
+                                         columns in INPUT_COLUMNS order
+    application/vnd.apache.arrow.stream  record batches with INPUT_COLUMNS
+
+Output (Accept):
+    application/x-ndjson                 header line with model_version and
+                                         feature_importance, then one line
+                                         per prediction
+    application/vnd.apache.arrow.stream  record batches of predictions, model
+                                         info in the schema metadata
+
+Input that turns out to be malformed after streaming has started ends the
+response cleanly with an error marker: an {"error": ...} line for NDJSON,
+an empty record batch with an "error" custom metadata key for Arrow.
+
+Both input and output are processed chunk by chunk, so memory stays flat
+regardless of batch size.
+"""
+
+import json
+from typing import Callable, Dict, Iterator, List, Any
+import numpy as np
+import pyarrow as pa
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+NPY = 'application/x-npy'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+BINARY_INPUTS = (NPY, ARROW_STREAM)
+STREAMING_OUTPUTS = (NDJSON, ARROW_STREAM)
+
+INPUT_COLUMNS = ['rigging_index', 'anomaly_score', 'tweet_count', 'avg_sentiment']
+
+CHUNK_ROWS = 8192
+
+PREDICTION_SCHEMA = pa.schema([
+    ('prediction', pa.bool_()),
+    ('confidence', pa.float32()),
+    ('probability_rigged', pa.float32())
+])
+
+
+class PayloadError(ValueError):
+    """Raised for malformed bulk scoring input"""
+    pass
+
+
+def _read_exact(stream, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        data = stream.read(size)
+        if not data:
+            break
+        chunks.append(data)
+        size -= len(data)
+    return b''.join(chunks)
+
+
+def iter_npy_chunks(stream, chunk_rows: int = CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """Read a .npy matrix from a stream, chunk_rows rows at a time"""
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise PayloadError(f"Invalid .npy payload: {e}")
+
+    if len(shape) != 2 or shape[1] != len(INPUT_COLUMNS) or fortran_order:
+        raise PayloadError(f"Expected a C-ordered (n, {len(INPUT_COLUMNS)}) matrix, got {shape}")
+    if dtype.kind not in 'fiu':
+        raise PayloadError(f"Expected a numeric matrix, got {dtype}")
+
+    row_bytes = shape[1] * dtype.itemsize
+    remaining = shape[0]
+    while remaining > 0:
+        rows = min(chunk_rows, remaining)
+        data = _read_exact(stream, rows * row_bytes)
+        if len(data) != rows * row_bytes:
+            raise PayloadError("Truncated .npy payload")
+        yield np.frombuffer(data, dtype=dtype).reshape(rows, shape[1]).astype(np.float64)
+        remaining -= rows
+
+
+def iter_arrow_chunks(stream, chunk_rows: int = CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """Read Arrow IPC stream record batches as feature matrices"""
+    try:
+        reader = pa.ipc.open_stream(pa.PythonFile(stream, mode='r'))
+    except (pa.ArrowException, OSError) as e:
+        raise PayloadError(f"Invalid Arrow stream: {e}")
+
+    missing = [c for c in INPUT_COLUMNS if c not in reader.schema.names]
+    if missing:
+        raise PayloadError(f"Arrow stream is missing columns: {missing}")
+
+    while True:
+        # Truncated or corrupt bodies only fail once the bad batch is reached
+        try:
+            batch = reader.read_next_batch()
+        except StopIteration:
+            return
+        except (pa.ArrowException, OSError) as e:
+            raise PayloadError(f"Invalid Arrow stream: {e}")
+
+        for offset in range(0, batch.num_rows, chunk_rows):
+            part = batch.slice(offset, chunk_rows)
+            try:
+                inputs = np.column_stack([
+                    part.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+                    for name in INPUT_COLUMNS
+                ])
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                raise PayloadError(f"Arrow columns must be numeric: {e}")
+            yield inputs
+
+
+def iter_json_chunks(signals: List[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """Convert JSON signal dicts to feature matrices chunk by chunk"""
+    for offset in range(0, len(signals), chunk_rows):
+        try:
+            inputs = np.array([
+                [float(signal.get(name, 0)) for name in INPUT_COLUMNS]
+                for signal in signals[offset:offset + chunk_rows]
+            ], dtype=np.float64)
+        except (AttributeError, TypeError, ValueError) as e:
+            raise PayloadError(f"Invalid signal in rows {offset}-{min(offset + chunk_rows, len(signals)) - 1}: {e}")
+        yield inputs
+
+
+def ndjson_stream(chunks: Iterator[np.ndarray], score: Callable[[np.ndarray], np.ndarray],
+                  header: Dict[str, Any]) -> Iterator[bytes]:
+    """Header line, then one JSON line per prediction"""
+    yield (json.dumps(header) + '\n').encode()
+
+    count = 0
+    try:
+        for inputs in chunks:
+            rigged = score(inputs)
+            lines = [
+                f'{{"prediction":{"true" if p > 0.5 else "false"},'
+                f'"confidence":{max(p, 1.0 - p):.6f},"probability_rigged":{p:.6f}}}\n'
+                for p in rigged.tolist()
+            ]
+            count += len(lines)
+            yield ''.join(lines).encode()
+    except PayloadError as e:
+        yield (json.dumps({'error': str(e)}) + '\n').encode()
+        return
+
+    yield (json.dumps({'count': count}) + '\n').encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def arrow_stream(chunks: Iterator[np.ndarray], score: Callable[[np.ndarray], np.ndarray],
+                 header: Dict[str, Any]) -> Iterator[bytes]:
+    """Arrow IPC stream of prediction record batches"""
+    schema = PREDICTION_SCHEMA.with_metadata({
+        key: json.dumps(value) for key, value in header.items()
+    })
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema)
+    yield sink.drain()
+
+    try:
+        for inputs in chunks:
+            rigged = score(inputs).astype(np.float32)
+            writer.write_batch(pa.record_batch([
+                pa.array(rigged > 0.5),
+                pa.array(np.maximum(rigged, 1.0 - rigged)),
+                pa.array(rigged)
+            ], schema=schema))
+            yield sink.drain()
+    except PayloadError as e:
+        empty = pa.record_batch([pa.array([], type=field.type) for field in schema], schema=schema)
+        writer.write_batch(empty, custom_metadata={'error': str(e)})
+
+    writer.close()
+    yield sink.drain()
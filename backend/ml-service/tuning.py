@@ -0,0 +1,171 @@
+"""
+Hyperparameter Search for the RandomForest model
+Evaluates a search space over time-ordered CV folds in a process pool
+
+Usage:
+    python tuning.py [--splits 5] [--max-candidates 24] [--workers 4]
+"""
+
+import os
+import time
+import shutil
+import random
+import logging
+import argparse
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.metrics import accuracy_score, f1_score
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [8, 15, None],
+    'min_samples_split': [2, 5],
+    'min_samples_leaf': [1, 2, 5],
+    'class_weight': ['balanced']
+}
+
+# Candidates whose mean F1 is within this distance of the best are ranked by
+# inference cost instead, so a cheaper forest wins over a marginally better one
+F1_TOLERANCE = 0.01
+
+LATENCY_SAMPLES = 25
+
+# Worker-process state, memory-mapped once per worker by _init_worker
+_X = None
+_y = None
+_folds = None
+
+
+def _init_worker(data_dir: str):
+    global _X, _y, _folds
+    _X = joblib.load(os.path.join(data_dir, 'X.joblib'), mmap_mode='r')
+    _y = joblib.load(os.path.join(data_dir, 'y.joblib'), mmap_mode='r')
+    _folds = joblib.load(os.path.join(data_dir, 'folds.joblib'), mmap_mode='r')
+
+
+def _evaluate(params: Dict[str, Any], random_state: int) -> Dict[str, Any]:
+    """Cross-validate one candidate on the cached folds"""
+    f1_scores = []
+    accuracies = []
+    fit_seconds = 0.0
+    model = None
+
+    for train_idx, test_idx in _folds:
+        # RandomForest splits are invariant to per-feature scaling, so the
+        # search runs on raw features
+        model = RandomForestClassifier(**params, random_state=random_state, n_jobs=1)
+        start = time.perf_counter()
+        model.fit(_X[train_idx], _y[train_idx])
+        fit_seconds += time.perf_counter() - start
+
+        pred = model.predict(_X[test_idx])
+        f1_scores.append(f1_score(_y[test_idx], pred, zero_division=0))
+        accuracies.append(accuracy_score(_y[test_idx], pred))
+
+    # Inference cost of the last fold's model: single-row latency (the
+    # /predict path) and total node count (memory / batch cost)
+    row = np.asarray(_X[_folds[-1][1][:1]])
+    model.predict_proba(row)  # warm-up
+    latencies = []
+    for _ in range(LATENCY_SAMPLES):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'params': params,
+        'mean_f1': float(np.mean(f1_scores)),
+        'std_f1': float(np.std(f1_scores)),
+        'mean_accuracy': float(np.mean(accuracies)),
+        'fold_f1': [float(f) for f in f1_scores],
+        'fit_seconds': round(fit_seconds, 3),
+        'predict_latency_ms': round(float(np.median(latencies)) * 1000, 4),
+        'total_nodes': int(sum(tree.tree_.node_count for tree in model.estimators_))
+    }
+
+
+def expand_search_space(space: Dict[str, List[Any]], max_candidates: Optional[int] = None,
+                        random_state: int = 42) -> List[Dict[str, Any]]:
+    """Grid over the search space, randomly subsampled to max_candidates"""
+    keys = sorted(space)
+    candidates = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+    if max_candidates and len(candidates) > max_candidates:
+        candidates = random.Random(random_state).sample(candidates, max_candidates)
+
+    return candidates
+
+
+def rank_candidates(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order by validation F1, preferring cheaper inference among near-ties"""
+    best_f1 = max(r['mean_f1'] for r in results)
+
+    def key(result):
+        near_best = result['mean_f1'] >= best_f1 - F1_TOLERANCE
+        return (
+            not near_best,
+            result['predict_latency_ms'] if near_best else -result['mean_f1'],
+            result['total_nodes']
+        )
+
+    return sorted(results, key=key)
+
+
+def search(X: np.ndarray, y: np.ndarray, search_space: Dict[str, List[Any]] = None,
+           n_splits: int = 5, max_candidates: Optional[int] = None,
+           max_workers: Optional[int] = None, random_state: int = 42) -> List[Dict[str, Any]]:
+    """
+    Evaluate every candidate on time-ordered folds of (X, y).
+    X and y must be sorted by signal time. Returns ranked results.
+    """
+    candidates = expand_search_space(search_space or DEFAULT_SEARCH_SPACE, max_candidates, random_state)
+    folds = [
+        (train_idx, test_idx)
+        for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(X)
+    ]
+
+    data_dir = tempfile.mkdtemp(prefix='ml-tuning-')
+    try:
+        # Written once; every worker memory-maps the same files
+        joblib.dump(np.ascontiguousarray(X, dtype=np.float64), os.path.join(data_dir, 'X.joblib'))
+        joblib.dump(np.ascontiguousarray(y), os.path.join(data_dir, 'y.joblib'))
+        joblib.dump(folds, os.path.join(data_dir, 'folds.joblib'))
+
+        logger.info(f"Evaluating {len(candidates)} candidates on {n_splits} time-ordered folds")
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(data_dir,)) as executor:
+            results = list(executor.map(_evaluate, candidates, itertools.repeat(random_state)))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return rank_candidates(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hyperparameter search for the rigging detector')
+    parser.add_argument('--splits', type=int, default=5)
+    parser.add_argument('--max-candidates', type=int)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    from ml_service import MLService
+
+    result = MLService().tune_model(
+        n_splits=args.splits,
+        max_candidates=args.max_candidates,
+        max_workers=args.workers
+    )
+    logger.info(f"Tuning result: {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Shared PostgreSQL Access Layer
+Thread-safe connection pooling, health checks, prepared statements and
+per-query timing for the Python services (ml-service, twitter-monitor,
+CLI dashboard)
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import connection as pg_connection
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection is considered broken and must not be reused
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class PooledConnection(pg_connection):
+    """psycopg2 connection that remembers its prepared statements"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        self.last_used = time.monotonic()
+
+
+class PostgresPool:
+    """
+    Thread-safe PostgreSQL connection pool
+
+    - Connections are created lazily, so services can start before the database
+    - Callers block while all connections are checked out
+    - Idle connections are health-checked on checkout and replaced if broken
+    - Registered statements are PREPAREd once per connection
+    - Every query is timed under a name; see stats()
+    """
+
+    def __init__(self, db_config: Dict[str, Any], minconn: int = 1, maxconn: int = 10,
+                 health_check_interval: float = 30.0):
+        self.db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.health_check_interval = health_check_interval
+        self._pool = None
+        self._lock = threading.Lock()
+        # psycopg2 pools raise when exhausted; callers wait for a free slot instead
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._statements: Dict[str, str] = {}
+        self._stats: Dict[str, List[float]] = {}
+        self._stats_lock = threading.Lock()
+        self._observers: List[Callable[[str, float], None]] = []
+
+    def _get_pool(self) -> pg_pool.ThreadedConnectionPool:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pg_pool.ThreadedConnectionPool(
+                        self.minconn,
+                        self.maxconn,
+                        connection_factory=PooledConnection,
+                        **self.db_config
+                    )
+                    logger.info(f"Created PostgreSQL pool ({self.minconn}-{self.maxconn} connections)")
+        return self._pool
+
+    def _checkout(self) -> PooledConnection:
+        """Get a healthy connection from the pool, reconnecting if needed"""
+        pool = self._get_pool()
+
+        for _ in range(self.maxconn + 1):
+            conn = pool.getconn()
+            if not conn.closed and self._is_alive(conn):
+                return conn
+            logger.warning("Discarding broken database connection")
+            pool.putconn(conn, close=True)
+
+        raise psycopg2.OperationalError("Could not obtain a healthy database connection")
+
+    def _is_alive(self, conn: PooledConnection) -> bool:
+        # Only ping connections that have been idle for a while, keeping the
+        # common checkout path free of an extra round trip
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except CONNECTION_ERRORS:
+            return False
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; commits on success, rolls back on error.
+        Broken connections are closed instead of being returned to the pool.
+        """
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            conn.last_used = time.monotonic()
+            self._get_pool().putconn(conn, close=broken or bool(conn.closed))
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self, cursor_factory=None):
+        """Borrow a connection and yield a cursor on it"""
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def prepare(self, name: str, sql: str):
+        """
+        Register a hot query as a prepared statement.
+        The SQL uses PostgreSQL positional parameters ($1, $2, ...).
+        """
+        self._statements[name] = sql
+
+    def execute(self, cursor, query: str, params: Optional[tuple] = None, name: str = 'query'):
+        """Execute an ad-hoc query, timed under name"""
+        start = time.perf_counter()
+        try:
+            cursor.execute(query, params)
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def execute_prepared(self, cursor, name: str, params: tuple = ()):
+        """Execute a statement registered with prepare(), timed under its name"""
+        conn = cursor.connection
+        start = time.perf_counter()
+        try:
+            if name not in conn.prepared:
+                cursor.execute(f"PREPARE {name} AS {self._statements[name]}")
+                conn.prepared.add(name)
+
+            if params:
+                placeholders = ', '.join(['%s'] * len(params))
+                cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+            else:
+                cursor.execute(f"EXECUTE {name}")
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    @contextmanager
+    def timed(self, name: str):
+        """Time a block under name, for work execute() does not cover (e.g. execute_values)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def add_observer(self, observer: Callable[[str, float], None]):
+        """Register a callback receiving (query_name, seconds) for every query"""
+        self._observers.append(observer)
+
+    def _record(self, name: str, elapsed: float):
+        with self._stats_lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                self._stats[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+
+        for observer in self._observers:
+            observer(name, elapsed)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-query call count, total, mean and max time in milliseconds"""
+        with self._stats_lock:
+            return {
+                name: {
+                    'count': int(count),
+                    'total_ms': round(total * 1000, 3),
+                    'mean_ms': round(total * 1000 / count, 3),
+                    'max_ms': round(maximum * 1000, 3)
+                }
+                for name, (count, total, maximum) in self._stats.items()
+            }
+
+    def check_health(self) -> bool:
+        """Run a round trip on a pooled connection"""
+        try:
+            with self.cursor() as cursor:
+                self.execute(cursor, "SELECT 1", name='health_check')
+                cursor.fetchone()
+            return True
+        except Exception as e:
+            logger.error(f"Database health check failed: {e}")
+            return False
+
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                logger.info("PostgreSQL pool closed")
+
+
+_pools: Dict[tuple, PostgresPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config: Dict[str, Any], **kwargs) -> PostgresPool:
+    """Return the process-wide pool for a database config, creating it once"""
+    key = tuple(sorted((k, str(v)) for k, v in db_config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PostgresPool(db_config, **kwargs)
+        return _pools[key]
@@ -0,0 +1,147 @@
+"""
+Sampling Profiler
+Low-overhead stack sampler producing collapsed stacks (flamegraph.pl /
+speedscope input) for the long-running Python services
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Periodically snapshots thread stacks with sys._current_frames().
+
+    Two modes share one sampler thread, which only runs while needed:
+    - track(): profiles a random fraction (sample_rate) of requests or poll
+      cycles, aggregating their stacks until collapsed() is called
+    - capture(seconds): time-boxed profile of every thread in the process
+    """
+
+    def __init__(self, sample_rate: float = 0.0, interval: float = 0.005,
+                 max_capture_seconds: float = 60.0):
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_capture_seconds = max_capture_seconds
+        self._lock = threading.Lock()
+        self._tracked = {}  # thread ident -> nesting depth
+        self._sampled = Counter()
+        self._capture: Optional[Counter] = None
+        self._capture_ident = None
+        self._capture_lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> 'SamplingProfiler':
+        """Build from PROFILE_SAMPLE_RATE / PROFILE_INTERVAL_MS"""
+        return cls(
+            sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', 0)),
+            interval=float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000.0
+        )
+
+    @contextmanager
+    def track(self):
+        """Profile the enclosed block with probability sample_rate"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield
+            return
+
+        ident = threading.get_ident()
+        with self._lock:
+            self._tracked[ident] = self._tracked.get(ident, 0) + 1
+            self._ensure_running()
+        try:
+            yield
+        finally:
+            with self._lock:
+                depth = self._tracked.pop(ident) - 1
+                if depth:
+                    self._tracked[ident] = depth
+
+    def capture(self, seconds: float) -> str:
+        """Sample all threads for the given duration and return collapsed stacks"""
+        seconds = max(0.0, min(seconds, self.max_capture_seconds))
+
+        if not self._capture_lock.acquire(blocking=False):
+            raise RuntimeError("A profile capture is already running")
+
+        try:
+            with self._lock:
+                self._capture = Counter()
+                self._capture_ident = threading.get_ident()
+                self._ensure_running()
+            time.sleep(seconds)
+            with self._lock:
+                counts, self._capture = self._capture, None
+        finally:
+            self._capture_lock.release()
+
+        return self._format(counts)
+
+    def collapsed(self, reset: bool = True) -> str:
+        """Return stacks aggregated from track()ed blocks"""
+        with self._lock:
+            counts = self._sampled
+            if reset:
+                self._sampled = Counter()
+            else:
+                counts = Counter(counts)
+        return self._format(counts)
+
+    def write(self, path: str, collapsed: str):
+        """Write collapsed stacks to a file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(collapsed)
+        logger.info(f"Wrote profile to {path}")
+
+    def _ensure_running(self):
+        # Caller holds self._lock
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+
+            with self._lock:
+                if self._capture is None and not self._tracked:
+                    self._thread = None
+                    return
+
+                for ident, frame in frames.items():
+                    tracked = ident in self._tracked
+                    captured = self._capture is not None and ident != self._capture_ident
+                    if ident == me or not (captured or tracked):
+                        continue
+
+                    stack = self._collapse(frame)
+                    if captured:
+                        self._capture[stack] += 1
+                    if tracked:
+                        self._sampled[stack] += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+    @staticmethod
+    def _format(counts: Counter) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in counts.most_common())
@@ -0,0 +1,357 @@
+"""
+Load Test Harness for the Twitter Monitor
+Drives the full TwitterMonitor pipeline with a synthetic Twitter client and
+an in-memory database at increasing tweet rates, and finds the rate at
+which latency, throughput or memory degrades
+
+Usage:
+    python loadtest.py [--start-rate 200] [--max-rate 20000] [--step-seconds 20]
+                       [--save-baseline baseline.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import TwitterMonitor
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = [
+    "Refs handed {team} that game again {tag} #RefereeBias",
+    "That last foul call was a joke, {team} fans deserve better {tag}",
+    "Great comeback by {team} tonight! {tag}",
+    "Something smells off about the 4th quarter whistles {tag} #FixedGame",
+    "{team} covering the spread with three phantom calls? NBA rigged {tag}",
+    "裁判今天太离谱了，{team} 这场比赛有问题 {tag} #NBA比赛",
+    "今晚 {team} 打得真好！{tag}",
+    "Los árbitros regalaron el partido a {team} {tag}",
+    "Quelle fin de match pour {team} 🔥🏀 {tag}",
+    "{team} 👀👀 referee corruption is real {tag}"
+]
+TEAMS = ['LAL', 'BOS', 'GSW', 'MIA', 'DEN', 'PHX', 'NYK', 'MIL']
+
+
+class FakeTwitterClient:
+    """
+    Stand-in for TwitterClient producing synthetic tweets.
+
+    Each search returns up to max_results tweets: a share are duplicates of
+    recently returned tweets (the same tweet matching several keywords or
+    polls), a share are retweets, and texts mix English, Chinese, Spanish
+    and emoji. fetch_latency simulates API round trips.
+    """
+
+    def __init__(self, duplicate_ratio: float = 0.2, retweet_ratio: float = 0.3,
+                 fetch_latency: float = 0.05, seed: int = 42):
+        self.duplicate_ratio = duplicate_ratio
+        self.retweet_ratio = retweet_ratio
+        self.fetch_latency = fetch_latency
+        self._random = random.Random(seed)
+        self._recent = deque(maxlen=2000)
+        self._next_id = 1_700_000_000_000_000_000
+        self._lock = threading.Lock()
+
+    def _tweet(self, query: str) -> Dict[str, Any]:
+        rng = self._random
+        self._next_id += rng.randint(1, 50)
+        text = rng.choice(TEMPLATES).format(team=rng.choice(TEAMS), tag=query)
+        retweets = 0
+        if rng.random() < self.retweet_ratio:
+            text = f"RT @user{rng.randint(1, 5000)}: {text}"
+            retweets = int(rng.paretovariate(1.2) * 10)
+
+        return {
+            'id': str(self._next_id),
+            'text': text,
+            'author_id': str(rng.randint(10_000, 10_000_000)),
+            'created_at': (datetime.utcnow() - timedelta(seconds=rng.randint(0, 300))).isoformat() + 'Z',
+            'public_metrics': {
+                'retweet_count': retweets,
+                'reply_count': rng.randint(0, 20),
+                'like_count': rng.randint(0, 500),
+                'quote_count': rng.randint(0, 5)
+            }
+        }
+
+    def search_recent_tweets(self, query: str, max_results: int = 100,
+                             tweet_fields: Optional[List[str]] = None) -> List[Dict]:
+        time.sleep(self.fetch_latency)
+        with self._lock:
+            tweets = []
+            for _ in range(max_results):
+                if self._recent and self._random.random() < self.duplicate_ratio:
+                    tweets.append(dict(self._random.choice(self._recent)))
+                else:
+                    tweet = self._tweet(query)
+                    self._recent.append(tweet)
+                    tweets.append(tweet)
+            return tweets
+
+
+class _FakePool:
+    def add_observer(self, fn):
+        pass
+
+
+class LocalDatabase:
+    """
+    In-memory stand-in for DatabaseManager with a simulated commit latency.
+    Keeps only the most recent rows so memory measurements reflect the
+    monitor, not the fake.
+    """
+
+    def __init__(self, write_latency: float = 0.005, keep_rows: int = 1000):
+        self.pool = _FakePool()
+        self.write_latency = write_latency
+        self.rows = deque(maxlen=keep_rows)
+        self.writes = 0
+
+    def insert_twitter_data(self, data: dict) -> bool:
+        time.sleep(self.write_latency)
+        json.dumps(data['sample_tweets'])  # serialization cost of the real insert
+        self.rows.append(data)
+        self.writes += 1
+        return True
+
+    def close(self):
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+class LoadTest:
+    """
+    Steps the offered tweet rate up geometrically. At each step, poll
+    cycles are submitted on a fixed schedule for step_seconds. A cycle
+    offers one fetch of max_results tweets per keyword.
+
+    A step is degraded when any of these holds:
+    - achieved throughput is below 90% of the offered rate
+    - p95 cycle latency (submission to persistence) exceeds latency_budget
+    - RSS grew by more than memory_budget_mb during the step
+    The ceiling is the highest rate before the first degraded step.
+    """
+
+    def __init__(self, monitor: TwitterMonitor, tweets_per_fetch: int = 100,
+                 step_seconds: float = 20.0, latency_budget: float = 5.0,
+                 memory_budget_mb: float = 100.0):
+        self.monitor = monitor
+        self.tweets_per_cycle = tweets_per_fetch * len(monitor.keywords)
+        self.step_seconds = step_seconds
+        self.latency_budget = latency_budget
+        self.memory_budget_mb = memory_budget_mb
+
+        # Every fetch returns a full page
+        fetch = monitor.fetch_tweets
+        monitor.fetch_tweets = lambda keyword, max_results=100: fetch(keyword, tweets_per_fetch)
+
+    def run_step(self, rate: float) -> Dict[str, Any]:
+        interval = self.tweets_per_cycle / rate
+        stats_before = self.monitor.pipeline.stats()
+        rss_before = current_rss_mb()
+        cycles = []
+
+        start = time.perf_counter()
+        next_submit = start
+        while time.perf_counter() - start < self.step_seconds:
+            # submit_cycle blocks under backpressure, which lowers the achieved rate
+            cycles.append(self.monitor.submit_cycle(f"LOADTEST_{len(cycles)}"))
+            next_submit += interval
+            time.sleep(max(0.0, next_submit - time.perf_counter()))
+
+        drain_deadline = time.perf_counter() + max(self.latency_budget * 4, 30.0)
+        for cycle in cycles:
+            cycle.done.wait(max(0.0, drain_deadline - time.perf_counter()))
+        # Throughput is over the whole step, including the time taken to drain
+        elapsed = time.perf_counter() - start
+
+        completed = [c for c in cycles if c.done.is_set()]
+        latencies = np.array([c.latency for c in completed]) if completed else np.array([np.inf])
+        stats_after = self.monitor.pipeline.stats()
+        fetched = stats_after['fetch']['rows'] - stats_before['fetch']['rows']
+        processed_tweets = len(completed) * self.tweets_per_cycle
+        persisted_tweets = sum(c.result.get('tweet_count', 0) for c in completed if c.result)
+
+        stages = {}
+        for name, after in stats_after.items():
+            before = stats_before[name]
+            cpu = after['cpu_seconds'] - before['cpu_seconds']
+            stages[name] = {
+                'cpu_seconds': round(cpu, 3),
+                'cpu_ms_per_1k_tweets': round(cpu * 1e6 / fetched, 3) if fetched else None,
+                'busy_seconds': round(after['busy_seconds'] - before['busy_seconds'], 3),
+                'max_queue_depth': after['max_queue_depth'],
+                'workers': after['workers']
+            }
+
+        rss_after = current_rss_mb()
+        result = {
+            'offered_rate': round(rate, 1),
+            # Offered tweets per second that made it through, comparable to offered_rate
+            'achieved_rate': round(processed_tweets / elapsed, 1),
+            # Unique tweets per second left after dedupe and stored
+            'persisted_rate': round(persisted_tweets / elapsed, 1),
+            'persisted_tweets': persisted_tweets,
+            'cycles_submitted': len(cycles),
+            'cycles_completed': len(completed),
+            'latency_p50': round(float(np.percentile(latencies, 50)), 4),
+            'latency_p95': round(float(np.percentile(latencies, 95)), 4),
+            'latency_max': round(float(latencies.max()), 4),
+            'rss_mb': round(rss_after, 1),
+            'rss_growth_mb': round(rss_after - rss_before, 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stages': stages
+        }
+        result['degraded'] = self._degradation(result)
+        return result
+
+    def _degradation(self, step: Dict[str, Any]) -> List[str]:
+        reasons = []
+        if step['achieved_rate'] < 0.9 * step['offered_rate']:
+            reasons.append('throughput')
+        if step['latency_p95'] > self.latency_budget:
+            reasons.append('latency')
+        if step['rss_growth_mb'] > self.memory_budget_mb:
+            reasons.append('memory')
+        return reasons
+
+    def run(self, start_rate: float, max_rate: float, factor: float = 2.0) -> Dict[str, Any]:
+        self.monitor.pipeline.start()
+        steps = []
+        ceiling = None
+        rate = start_rate
+
+        while rate <= max_rate:
+            logger.info(f"Load step: {rate:.0f} tweets/s for {self.step_seconds}s")
+            step = self.run_step(rate)
+            steps.append(step)
+            logger.info(f"  achieved {step['achieved_rate']} tweets/s, p95 {step['latency_p95']}s, "
+                        f"peak RSS {step['peak_rss_mb']} MB, degraded: {step['degraded'] or 'no'}")
+            if step['degraded']:
+                break
+            ceiling = step['offered_rate']
+            rate *= factor
+
+        self.monitor.pipeline.stop()
+
+        return {
+            'recorded_at': datetime.utcnow().isoformat() + 'Z',
+            'python': sys.version.split()[0],
+            'ceiling_tweets_per_second': ceiling,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'settings': {
+                'tweets_per_cycle': self.tweets_per_cycle,
+                'step_seconds': self.step_seconds,
+                'latency_budget': self.latency_budget,
+                'memory_budget_mb': self.memory_budget_mb
+            },
+            'steps': steps
+        }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> List[str]:
+    """Regressions of report against baseline, beyond tolerance"""
+    regressions = []
+
+    ceiling, base_ceiling = report['ceiling_tweets_per_second'], baseline['ceiling_tweets_per_second']
+    if base_ceiling and (ceiling or 0) < base_ceiling * (1 - tolerance):
+        regressions.append(f"ceiling {ceiling} < baseline {base_ceiling}")
+
+    if report['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance):
+        regressions.append(f"peak RSS {report['peak_rss_mb']} MB > baseline {baseline['peak_rss_mb']} MB")
+
+    # Per-tweet stage CPU at the highest rate both runs sustained
+    base_steps = {step['offered_rate']: step for step in baseline['steps'] if not step['degraded']}
+    shared = [step for step in report['steps'] if not step['degraded'] and step['offered_rate'] in base_steps]
+    if shared:
+        step = shared[-1]
+        for name, stage in step['stages'].items():
+            base = base_steps[step['offered_rate']]['stages'].get(name, {}).get('cpu_ms_per_1k_tweets')
+            current = stage['cpu_ms_per_1k_tweets']
+            if base and current and current > base * (1 + tolerance):
+                regressions.append(f"{name} CPU {current} ms/1k tweets > baseline {base}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Twitter monitor pipeline')
+    parser.add_argument('--start-rate', type=float, default=200, help='tweets per second')
+    parser.add_argument('--max-rate', type=float, default=20000)
+    parser.add_argument('--factor', type=float, default=2.0)
+    parser.add_argument('--step-seconds', type=float, default=20)
+    parser.add_argument('--latency-budget', type=float, default=5.0, help='p95 cycle latency, seconds')
+    parser.add_argument('--memory-budget-mb', type=float, default=100)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2)
+    parser.add_argument('--retweet-ratio', type=float, default=0.3)
+    parser.add_argument('--fetch-latency-ms', type=float, default=50)
+    parser.add_argument('--write-latency-ms', type=float, default=5)
+    parser.add_argument('--save-baseline', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    monitor = TwitterMonitor(
+        twitter_client=FakeTwitterClient(
+            duplicate_ratio=args.duplicate_ratio,
+            retweet_ratio=args.retweet_ratio,
+            fetch_latency=args.fetch_latency_ms / 1000.0
+        ),
+        db=LocalDatabase(write_latency=args.write_latency_ms / 1000.0)
+    )
+    # Per-cycle INFO logs would dominate the measurement
+    logging.getLogger('main').setLevel(logging.WARNING)
+    logging.getLogger('pipeline').setLevel(logging.WARNING)
+
+    report = LoadTest(
+        monitor,
+        step_seconds=args.step_seconds,
+        latency_budget=args.latency_budget,
+        memory_budget_mb=args.memory_budget_mb
+    ).run(args.start_rate, args.max_rate, args.factor)
+
+    logger.info(f"Ceiling: {report['ceiling_tweets_per_second']} tweets/s, peak RSS {report['peak_rss_mb']} MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            for regression in regressions:
+                logger.error(f"Regression: {regression}")
+            sys.exit(1)
+        logger.info("No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
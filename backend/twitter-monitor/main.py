@@ -6,16 +6,26 @@ Monitors Twitter for NBA-related sentiment and calculates rigging index
 import os
 import sys
 import time
+import signal
 import logging
+import threading
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Shared Python modules live in backend/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
 
 from tweepy_client import TwitterClient
 from sentiment_analyzer import SentimentAnalyzer
 from database import DatabaseManager
+from pipeline import Pipeline, Stage
+from tweet_batch import TweetBatch
+from sampling_profiler import SamplingProfiler
+import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -27,14 +37,67 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 
+class PollCycle:
+    """One poll of every keyword for a game, tracked through the pipeline"""
+
+    def __init__(self, game_id: str, keywords: List[str]):
+        self.game_id = game_id
+        self.keywords = keywords
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+        self.timestamp = datetime.utcnow().isoformat() + 'Z'
+        self.batches: Dict[str, 'KeywordBatch'] = {}
+        self.result: Optional[dict] = None
+        self.errors: List[str] = []
+        self.done = threading.Event()
+        self._seen = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def claim_new(self, tweets: TweetBatch) -> TweetBatch:
+        """Tweets not yet seen in this cycle (one tweet can match several keywords)"""
+        with self._lock:
+            fresh = tweets.unique_new(self._seen)
+            self._seen = np.concatenate([self._seen, fresh.ids])
+        return fresh
+
+    def record_error(self, error: str):
+        with self._lock:
+            self.errors.append(error)
+
+    def add(self, batch: 'KeywordBatch') -> bool:
+        """Record a finished keyword batch; True once every keyword is in"""
+        with self._lock:
+            self.batches[batch.keyword] = batch
+            return len(self.batches) == len(self.keywords)
+
+
+class KeywordBatch:
+    """Tweets for one keyword of a poll cycle; the pipeline work unit"""
+
+    def __init__(self, cycle: PollCycle, keyword: str):
+        self.cycle = cycle
+        self.keyword = keyword
+        self.tweets = TweetBatch.empty()
+
+    def __len__(self) -> int:
+        return len(self.tweets)
+
+
 class TwitterMonitor:
     """Main Twitter monitoring service"""
 
-    def __init__(self):
-        self.twitter_client = TwitterClient()
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.db = DatabaseManager()
+    def __init__(self, twitter_client=None, sentiment_analyzer=None, db=None):
+        # Dependencies can be injected (see loadtest.py); defaults are the live ones
+        self.twitter_client = twitter_client or TwitterClient()
+        self.sentiment_analyzer = sentiment_analyzer or SentimentAnalyzer()
+        self.db = db or DatabaseManager()
+        self.db.pool.add_observer(metrics.observe_db_query)
         self.poll_interval = 30  # seconds
+        self.cycle_timeout = float(os.getenv('PIPELINE_CYCLE_TIMEOUT', 300))
+        self.metrics_port = int(os.getenv('METRICS_PORT', 9100))
+        self.profiler = SamplingProfiler.from_env()
+        self.profile_dir = os.getenv('PROFILE_DIR', '/tmp/profiles')
+        self.profile_seconds = float(os.getenv('PROFILE_CAPTURE_SECONDS', 30))
         self.keywords = [
             '#NBA',
             '#FixedGame',
@@ -43,21 +106,47 @@ class TwitterMonitor:
             'NBA rigged',
             'referee corruption'
         ]
+        self.pipeline = self.build_pipeline()
+
+    def build_pipeline(self) -> Pipeline:
+        """
+        fetch -> dedupe -> sentiment -> aggregate -> persist, each with its
+        own workers (PIPELINE_<STAGE>_WORKERS) behind a bounded queue
+        (PIPELINE_QUEUE_SIZE)
+        """
+        queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', 64))
+
+        def stage(name, handler, default_workers, on_error=None):
+            workers = int(os.getenv(f'PIPELINE_{name.upper()}_WORKERS', default_workers))
+            return Stage(name, handler, workers=workers, queue_size=queue_size,
+                         profiler=self.profiler, on_error=on_error)
+
+        return Pipeline([
+            stage('fetch', self._fetch_stage, len(self.keywords), self._keyword_failed('fetch')),
+            stage('dedupe', self._dedupe_stage, 1, self._keyword_failed('dedupe')),
+            stage('sentiment', self._sentiment_stage, 2, self._keyword_failed('sentiment')),
+            stage('aggregate', self._aggregate_stage, 1, self._aggregate_failed),
+            stage('persist', self._persist_stage, 1)
+        ])
 
     def fetch_tweets(self, keyword: str, max_results: int = 100) -> list:
         """Fetch recent tweets for a keyword"""
         try:
-            tweets = self.twitter_client.search_recent_tweets(
-                query=keyword,
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'author_id']
-            )
-            return tweets if tweets else []
+            with metrics.FETCH_SECONDS.labels(keyword).time():
+                tweets = self.twitter_client.search_recent_tweets(
+                    query=keyword,
+                    max_results=min(max_results, 100),
+                    tweet_fields=['created_at', 'public_metrics', 'author_id']
+                )
+            if not tweets:
+                return []
+            metrics.TWEETS_FETCHED.labels(keyword).inc(len(tweets))
+            return tweets
         except Exception as e:
             logger.error(f"Error fetching tweets for {keyword}: {e}")
             return []
 
-    def calculate_rigging_index(self, tweets: list, sentiment_scores: list) -> dict:
+    def calculate_rigging_index(self, tweets: TweetBatch) -> dict:
         """
         Calculate rigging index based on:
         - Tweet count in last 5 minutes
@@ -67,7 +156,7 @@ class TwitterMonitor:
         Formula:
         Rigging Index = (tweet_count * 0.4) + (avg_sentiment * -0.3) + (retweet_velocity * 0.3)
         """
-        if not tweets or not sentiment_scores:
+        if not len(tweets):
             return {
                 'rigging_index': 0.0,
                 'tweet_count': 0,
@@ -76,11 +165,11 @@ class TwitterMonitor:
             }
 
         tweet_count = len(tweets)
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
+        avg_sentiment = float(np.nanmean(tweets.sentiments)) if not np.isnan(tweets.sentiments).all() else 0.0
 
         # Calculate retweet velocity (retweets per minute)
-        total_retweets = sum(t.get('public_metrics', {}).get('retweet_count', 0) for t in tweets)
-        retweet_velocity = total_retweets / 5.0 if tweet_count > 0 else 0.0
+        total_retweets = int(tweets.retweets.sum(dtype=np.int64))
+        retweet_velocity = total_retweets / 5.0
 
         # Normalize values to 0-1 range
         normalized_tweet_count = min(tweet_count / 1000.0, 1.0)
@@ -100,53 +189,127 @@ class TwitterMonitor:
             'retweet_velocity': round(retweet_velocity, 2)
         }
 
+    def submit_cycle(self, game_id: str) -> PollCycle:
+        """
+        Queue one poll cycle. Blocks while the pipeline is backed up, so
+        polling slows down to what persistence can absorb.
+        """
+        self.pipeline.start()
+        cycle = PollCycle(game_id, self.keywords)
+        for keyword in self.keywords:
+            self.pipeline.submit(KeywordBatch(cycle, keyword))
+        return cycle
+
     def process_tweets(self, game_id: str) -> dict:
-        """Process tweets for a specific game"""
+        """Process tweets for a specific game and wait for the stored result"""
         logger.info(f"Processing tweets for game: {game_id}")
+        cycle = self.submit_cycle(game_id)
+        if not cycle.done.wait(self.cycle_timeout):
+            logger.error(f"Poll cycle for {game_id} did not finish within {self.cycle_timeout}s")
+            cycle.record_error(f"timed out after {self.cycle_timeout}s")
+            return {'game_id': game_id, 'timestamp': cycle.timestamp, 'errors': list(cycle.errors)}
+        return cycle.result
 
-        all_tweets = []
-        all_sentiments = []
+    def _keyword_failed(self, stage: str):
+        """
+        Error handler for keyword stages: the keyword continues as an empty
+        batch, so its cycle still completes, with the error recorded
+        """
+        def on_error(batch: KeywordBatch, error: Exception) -> list:
+            batch.cycle.record_error(f"{stage} {batch.keyword}: {error}")
+            batch.tweets = TweetBatch.empty()
+            return [batch]
+        return on_error
 
-        # Fetch tweets for each keyword
-        for keyword in self.keywords:
-            tweets = self.fetch_tweets(keyword)
-            all_tweets.extend(tweets)
+    def _aggregate_failed(self, batch: KeywordBatch, error: Exception) -> list:
+        cycle = batch.cycle
+        cycle.record_error(f"aggregate: {error}")
+        cycle.result = {'game_id': cycle.game_id, 'timestamp': cycle.timestamp, 'errors': list(cycle.errors)}
+        self._finish_cycle(cycle)
+        return []
+
+    def _finish_cycle(self, cycle: PollCycle):
+        cycle.latency = time.perf_counter() - cycle.started
+        metrics.POLL_CYCLE_SECONDS.observe(cycle.latency)
+        cycle.done.set()
+
+    def _fetch_stage(self, batch: KeywordBatch) -> list:
+        # Only the columns the pipeline uses are kept; the API dicts are dropped here
+        batch.tweets = TweetBatch.from_tweets(self.fetch_tweets(batch.keyword))
+        return [batch]
+
+    def _dedupe_stage(self, batch: KeywordBatch) -> list:
+        batch.tweets = batch.cycle.claim_new(batch.tweets)
+        return [batch]
+
+    def _sentiment_stage(self, batch: KeywordBatch) -> list:
+        sentiments = batch.tweets.sentiments
+        for i, text in enumerate(batch.tweets.texts):
+            with metrics.SENTIMENT_SECONDS.time():
+                sentiments[i] = self.sentiment_analyzer.analyze(text)
+        return [batch]
+
+    def _aggregate_stage(self, batch: KeywordBatch) -> list:
+        cycle = batch.cycle
+        if not cycle.add(batch):
+            return []
 
-            # Analyze sentiment
-            for tweet in tweets:
-                text = tweet.get('text', '')
-                sentiment = self.sentiment_analyzer.analyze(text)
-                all_sentiments.append(sentiment)
+        # Keyword order, not arrival order, so results are deterministic
+        tweets = TweetBatch.concat([cycle.batches[keyword].tweets for keyword in cycle.keywords])
 
         # Calculate rigging index
-        metrics = self.calculate_rigging_index(all_tweets, all_sentiments)
-
-        # Prepare result
-        result = {
-            'game_id': game_id,
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'rigging_index': metrics['rigging_index'],
-            'tweet_count': metrics['tweet_count'],
-            'avg_sentiment': metrics['avg_sentiment'],
-            'retweet_velocity': metrics['retweet_velocity'],
-            'sample_tweets': [
-                {
-                    'text': t.get('text', '')[:100],
-                    'created_at': t.get('created_at', ''),
-                    'retweets': t.get('public_metrics', {}).get('retweet_count', 0)
-                }
-                for t in all_tweets[:5]
-            ]
+        index = self.calculate_rigging_index(tweets)
+
+        cycle.result = {
+            'game_id': cycle.game_id,
+            'timestamp': cycle.timestamp,
+            'rigging_index': index['rigging_index'],
+            'tweet_count': index['tweet_count'],
+            'avg_sentiment': index['avg_sentiment'],
+            'retweet_velocity': index['retweet_velocity'],
+            'sample_tweets': tweets.sample(5)
         }
+        if cycle.errors:
+            cycle.result['errors'] = list(cycle.errors)
+        return [cycle]
 
-        # Store in database
+    def _persist_stage(self, cycle: PollCycle) -> list:
         try:
-            self.db.insert_twitter_data(result)
-            logger.info(f"Stored twitter data for {game_id}: rigging_index={metrics['rigging_index']}")
+            if not self.db.insert_twitter_data(cycle.result):
+                raise RuntimeError("insert_twitter_data failed")
+            logger.info(f"Stored twitter data for {cycle.game_id}: rigging_index={cycle.result['rigging_index']}")
         except Exception as e:
             logger.error(f"Error storing twitter data: {e}")
+            cycle.record_error(f"persist: {e}")
+            cycle.result['errors'] = list(cycle.errors)
+        finally:
+            self._finish_cycle(cycle)
+        return []
+
+    def install_profile_signals(self):
+        """
+        SIGUSR1: capture a time-boxed profile of the whole process
+        SIGUSR2: dump stacks aggregated from sampled poll cycles
+        """
+        def capture():
+            try:
+                collapsed = self.profiler.capture(self.profile_seconds)
+                self.profiler.write(self._profile_path('capture'), collapsed)
+            except RuntimeError as e:
+                logger.warning(f"Profile capture skipped: {e}")
 
-        return result
+        def on_capture(signum, frame):
+            logger.info(f"Capturing {self.profile_seconds}s profile")
+            threading.Thread(target=capture, name='profile-capture', daemon=True).start()
+
+        def on_dump(signum, frame):
+            self.profiler.write(self._profile_path('sampled'), self.profiler.collapsed())
+
+        signal.signal(signal.SIGUSR1, on_capture)
+        signal.signal(signal.SIGUSR2, on_dump)
+
+    def _profile_path(self, kind: str) -> str:
+        return os.path.join(self.profile_dir, f"twitter-monitor-{kind}-{int(time.time())}.collapsed")
 
     def run(self):
         """Main monitoring loop"""
@@ -155,10 +318,17 @@ class TwitterMonitor:
         # Example game ID (in production, this would come from a schedule)
         game_id = f"NBA_{datetime.utcnow().strftime('%Y%m%d')}_LAL_BOS"
 
+        metrics.start_exporter(self.metrics_port)
+        self.install_profile_signals()
+        self.pipeline.start()
+
         try:
             while True:
                 try:
-                    self.process_tweets(game_id)
+                    # Cycles overlap: a slow write no longer delays the next
+                    # fetch until the queues in between are full
+                    self.submit_cycle(game_id)
+                    logger.debug(f"Pipeline stats: {self.pipeline.stats()}")
                     logger.info(f"Sleeping for {self.poll_interval} seconds...")
                     time.sleep(self.poll_interval)
                 except Exception as e:
@@ -166,6 +336,7 @@ class TwitterMonitor:
                     time.sleep(self.poll_interval)
         except KeyboardInterrupt:
             logger.info("Twitter Monitor stopped")
+            self.pipeline.stop()
             self.db.close()
 
 
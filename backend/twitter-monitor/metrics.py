@@ -0,0 +1,85 @@
+"""
+Prometheus Metrics for Twitter Monitor
+Hot-path latency histograms, served by a background HTTP exporter
+"""
+
+import logging
+from prometheus_client import Histogram, Counter, Gauge, start_http_server
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FETCH_SECONDS = Histogram(
+    'monitor_fetch_seconds',
+    'Time spent fetching tweets for one keyword',
+    ['keyword'],
+    buckets=LATENCY_BUCKETS
+)
+
+SENTIMENT_SECONDS = Histogram(
+    'monitor_sentiment_seconds',
+    'Sentiment analysis time per tweet',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+DB_WRITE_SECONDS = Histogram(
+    'monitor_db_query_seconds',
+    'Database query time by query name',
+    ['query'],
+    buckets=LATENCY_BUCKETS
+)
+
+POLL_CYCLE_SECONDS = Histogram(
+    'monitor_poll_cycle_seconds',
+    'Duration of one full poll cycle (all keywords), from submission to persistence',
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+
+TWEETS_FETCHED = Counter(
+    'monitor_tweets_fetched_total',
+    'Tweets fetched from the Twitter API',
+    ['keyword']
+)
+
+STAGE_QUEUE_DEPTH = Gauge(
+    'monitor_stage_queue_depth',
+    'Items waiting in a pipeline stage inbox',
+    ['stage']
+)
+
+STAGE_ITEMS = Counter(
+    'monitor_stage_items_total',
+    'Work items processed by a pipeline stage',
+    ['stage']
+)
+
+STAGE_ROWS = Counter(
+    'monitor_stage_rows_total',
+    'Tweets carried by the work items a pipeline stage processed',
+    ['stage']
+)
+
+STAGE_SECONDS = Histogram(
+    'monitor_stage_seconds',
+    'Handler time per work item in a pipeline stage',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+
+STAGE_CPU_SECONDS = Counter(
+    'monitor_stage_cpu_seconds_total',
+    'Thread CPU time spent in a pipeline stage handler',
+    ['stage']
+)
+
+
+def observe_db_query(name: str, seconds: float):
+    """PostgresPool observer feeding DB_WRITE_SECONDS"""
+    DB_WRITE_SECONDS.labels(name).observe(seconds)
+
+
+def start_exporter(port: int):
+    """Serve /metrics on a daemon thread"""
+    start_http_server(port)
+    logger.info(f"Metrics exporter listening on :{port}")
@@ -0,0 +1,164 @@
+"""
+Staged Processing Pipeline
+Worker-thread stages connected by bounded queues, with backpressure and
+per-stage queue depth, throughput and CPU accounting
+"""
+
+import time
+import queue
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tells a worker thread to exit
+_STOP = object()
+
+
+class Stage:
+    """
+    A pool of worker threads pulling items from a bounded inbox.
+
+    Each worker calls handler(item) and puts every returned item into the
+    next stage's inbox. put() blocks while an inbox is full, so a slow
+    stage throttles everything upstream of it instead of buffering
+    without limit.
+
+    When the handler raises, on_error(item, error) is called instead and
+    its returned items are forwarded, so work that downstream stages wait
+    on is not silently dropped.
+
+    Throughput counts items and, for items with a len(), rows (tweets).
+    Busy and CPU time (time.thread_time) cover the handler only, not time
+    spent blocked on a full downstream queue.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Optional[Iterable[Any]]],
+                 workers: int = 1, queue_size: int = 64, profiler=None,
+                 on_error: Optional[Callable[[Any, Exception], Optional[Iterable[Any]]]] = None):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.next: Optional['Stage'] = None
+        self.profiler = profiler
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stats = {
+            'items': 0,
+            'rows': 0,
+            'errors': 0,
+            'busy_seconds': 0.0,
+            'cpu_seconds': 0.0,
+            'max_queue_depth': 0
+        }
+
+    def put(self, item: Any):
+        """Queue an item, blocking while the inbox is full"""
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        metrics.STAGE_QUEUE_DEPTH.labels(self.name).set(depth)
+        with self._lock:
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Let queued items drain, then stop the workers"""
+        for _ in self._threads:
+            self.inbox.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self):
+        while True:
+            item = self.inbox.get()
+            metrics.STAGE_QUEUE_DEPTH.labels(self.name).set(self.inbox.qsize())
+            if item is _STOP:
+                return
+
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            outputs = ()
+            failed = False
+            try:
+                with self.profiler.track() if self.profiler else nullcontext():
+                    outputs = list(self.handler(item) or ())
+            except Exception as e:
+                logger.error(f"Error in pipeline stage {self.name}: {e}")
+                failed = True
+                if self.on_error is not None:
+                    try:
+                        outputs = list(self.on_error(item, e) or ())
+                    except Exception as handler_error:
+                        logger.error(f"Error handler failed in pipeline stage {self.name}: {handler_error}")
+            busy = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+
+            rows = len(item) if hasattr(item, '__len__') else 1
+            with self._lock:
+                self._stats['items'] += 1
+                self._stats['rows'] += rows
+                self._stats['errors'] += int(failed)
+                self._stats['busy_seconds'] += busy
+                self._stats['cpu_seconds'] += cpu
+
+            metrics.STAGE_ITEMS.labels(self.name).inc()
+            metrics.STAGE_ROWS.labels(self.name).inc(rows)
+            metrics.STAGE_SECONDS.labels(self.name).observe(busy)
+            metrics.STAGE_CPU_SECONDS.labels(self.name).inc(cpu)
+
+            if self.next is not None:
+                for output in outputs:
+                    self.next.put(output)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['workers'] = self.workers
+        stats['queue_depth'] = self.inbox.qsize()
+        stats['queue_size'] = self.inbox.maxsize
+        return stats
+
+
+class Pipeline:
+    """Stages chained in order; items enter at the first stage"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        for upstream, downstream in zip(stages, stages[1:]):
+            upstream.next = downstream
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            for stage in self.stages:
+                stage.start()
+            self._started = True
+
+    def submit(self, item: Any):
+        """Feed the first stage; blocks when the pipeline is backed up"""
+        self.stages[0].put(item)
+
+    def stop(self):
+        """Drain and stop stages front to back"""
+        with self._start_lock:
+            for stage in self.stages:
+                stage.stop()
+            self._started = False
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,126 @@
+"""
+Columnar Tweet Batches
+Compact typed-array representation of the tweet fields the monitor uses
+"""
+
+from typing import List, Sequence
+import numpy as np
+
+# Stands in for a missing or malformed tweet id; such tweets are never deduped
+MISSING_ID = 0
+
+
+def _tweet_id(tweet: dict) -> int:
+    try:
+        return int(tweet.get('id') or MISSING_ID)
+    except (TypeError, ValueError):
+        return MISSING_ID
+
+
+def _parse_timestamps(values: List) -> np.ndarray:
+    """datetime64[ms] column; missing or unparseable values become NaT"""
+    # API timestamps are UTC with a trailing Z, which datetime64 does not parse
+    stamps = [value.rstrip('Z') if isinstance(value, str) and value else 'NaT' for value in values]
+    try:
+        return np.array(stamps, dtype='datetime64[ms]')
+    except ValueError:
+        # One bad value fails the whole array: fall back to parsing one by one
+        parsed = np.full(len(stamps), np.datetime64('NaT'), dtype='datetime64[ms]')
+        for i, stamp in enumerate(stamps):
+            try:
+                parsed[i] = np.datetime64(stamp, 'ms')
+            except ValueError:
+                pass
+        return parsed
+
+
+class TweetBatch:
+    """
+    One column per field instead of one tweepy dict per tweet:
+
+        ids          int64            tweet id, MISSING_ID when missing
+        created_at   datetime64[ms]   NaT when missing or unparseable
+        texts        list of str      references to the original strings
+        retweets     int32            public_metrics.retweet_count
+        sentiments   float64          NaN until scored
+
+    Built once at fetch time, after which the source dicts can be freed.
+    Dedupe, slicing and aggregation work on whole columns.
+    """
+
+    __slots__ = ('ids', 'created_at', 'texts', 'retweets', 'sentiments')
+
+    def __init__(self, ids: np.ndarray, created_at: np.ndarray, texts: List[str],
+                 retweets: np.ndarray, sentiments: np.ndarray = None):
+        self.ids = ids
+        self.created_at = created_at
+        self.texts = texts
+        self.retweets = retweets
+        self.sentiments = sentiments if sentiments is not None else np.full(len(ids), np.nan)
+
+    @classmethod
+    def from_tweets(cls, tweets: Sequence[dict]) -> 'TweetBatch':
+        """Build from Twitter API v2 tweet dicts"""
+        n = len(tweets)
+        return cls(
+            ids=np.fromiter((_tweet_id(t) for t in tweets), dtype=np.int64, count=n),
+            created_at=_parse_timestamps([t.get('created_at') for t in tweets]),
+            texts=[t.get('text', '') for t in tweets],
+            retweets=np.fromiter(
+                (t.get('public_metrics', {}).get('retweet_count', 0) for t in tweets),
+                dtype=np.int32, count=n
+            )
+        )
+
+    @classmethod
+    def empty(cls) -> 'TweetBatch':
+        return cls.from_tweets([])
+
+    @classmethod
+    def concat(cls, batches: Sequence['TweetBatch']) -> 'TweetBatch':
+        if not batches:
+            return cls.empty()
+        return cls(
+            ids=np.concatenate([b.ids for b in batches]),
+            created_at=np.concatenate([b.created_at for b in batches]),
+            texts=[text for b in batches for text in b.texts],
+            retweets=np.concatenate([b.retweets for b in batches]),
+            sentiments=np.concatenate([b.sentiments for b in batches])
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, indices: np.ndarray) -> 'TweetBatch':
+        """Rows at the given positions, in that order"""
+        return TweetBatch(
+            ids=self.ids[indices],
+            created_at=self.created_at[indices],
+            texts=[self.texts[i] for i in indices.tolist()],
+            retweets=self.retweets[indices],
+            sentiments=self.sentiments[indices]
+        )
+
+    def unique_new(self, seen: np.ndarray) -> 'TweetBatch':
+        """
+        First occurrence of each id not already in seen, in arrival order.
+        Tweets without an id cannot be matched, so all of them are kept.
+        """
+        _, first = np.unique(self.ids, return_index=True)
+        keep = np.zeros(len(self.ids), dtype=bool)
+        keep[first] = True
+        keep &= ~np.isin(self.ids, seen)
+        keep |= self.ids == MISSING_ID
+        return self.take(np.flatnonzero(keep))
+
+    def sample(self, n: int = 5) -> List[dict]:
+        """First n tweets in the twitter_data.sample_tweets format"""
+        created_at = np.datetime_as_string(self.created_at[:n], unit='ms')
+        return [
+            {
+                'text': text[:100],
+                'created_at': '' if stamp == 'NaT' else stamp + 'Z',
+                'retweets': int(retweets)
+            }
+            for text, stamp, retweets in zip(self.texts[:n], created_at, self.retweets[:n])
+        ]
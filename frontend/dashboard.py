@@ -6,10 +6,14 @@ Real-time monitoring of system status
 import os
 import sys
 import time
-import psycopg2
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+# Shared Python modules live in backend/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'shared'))
+
+from pg_pool import get_pool
+
 load_dotenv()
 
 
@@ -17,35 +21,54 @@ class Dashboard:
     """CLI Dashboard for monitoring NBA Integrity Guard"""
 
     def __init__(self):
-        self.conn = None
+        self.db = None
         self.connect()
 
     def connect(self):
         """Connect to PostgreSQL database"""
-        try:
-            self.conn = psycopg2.connect(
-                host=os.getenv('POSTGRES_HOST', 'localhost'),
-                port=os.getenv('POSTGRES_PORT', 5432),
-                database=os.getenv('POSTGRES_DB', 'nba_integrity'),
-                user=os.getenv('POSTGRES_USER', 'admin'),
-                password=os.getenv('POSTGRES_PASSWORD', 'password')
-            )
-        except Exception as e:
-            print(f"Error connecting to database: {e}")
+        self.db = get_pool({
+            'host': os.getenv('POSTGRES_HOST', 'localhost'),
+            'port': os.getenv('POSTGRES_PORT', 5432),
+            'database': os.getenv('POSTGRES_DB', 'nba_integrity'),
+            'user': os.getenv('POSTGRES_USER', 'admin'),
+            'password': os.getenv('POSTGRES_PASSWORD', 'password')
+        }, maxconn=2)
+
+        self.db.prepare('latest_twitter_data', """
+            SELECT rigging_index, tweet_count, avg_sentiment, timestamp
+            FROM twitter_data
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """)
+        self.db.prepare('latest_market_data', """
+            SELECT yes_price, no_price, anomaly_score, anomaly_detected, timestamp
+            FROM market_data
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """)
+        self.db.prepare('recent_trades', """
+            SELECT trade_id, signal_type, action, amount, estimated_payout, status, timestamp
+            FROM trades
+            ORDER BY timestamp DESC
+            LIMIT $1
+        """)
+        self.db.prepare('recent_signal_logs', """
+            SELECT signal_type, rigging_index, anomaly_score, timestamp
+            FROM signal_logs
+            ORDER BY timestamp DESC
+            LIMIT $1
+        """)
+
+        if not self.db.check_health():
+            print("Error connecting to database")
             sys.exit(1)
 
     def get_latest_twitter_data(self):
         """Get latest Twitter sentiment data"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT rigging_index, tweet_count, avg_sentiment, timestamp
-                FROM twitter_data
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """)
-            result = cursor.fetchone()
-            cursor.close()
+            with self.db.cursor() as cursor:
+                self.db.execute_prepared(cursor, 'latest_twitter_data')
+                result = cursor.fetchone()
             return result
         except Exception as e:
             print(f"Error fetching twitter data: {e}")
@@ -54,15 +77,9 @@ class Dashboard:
     def get_latest_market_data(self):
         """Get latest market anomaly data"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT yes_price, no_price, anomaly_score, anomaly_detected, timestamp
-                FROM market_data
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """)
-            result = cursor.fetchone()
-            cursor.close()
+            with self.db.cursor() as cursor:
+                self.db.execute_prepared(cursor, 'latest_market_data')
+                result = cursor.fetchone()
             return result
         except Exception as e:
             print(f"Error fetching market data: {e}")
@@ -71,15 +88,9 @@ class Dashboard:
     def get_recent_trades(self, limit=5):
         """Get recent trades"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT trade_id, signal_type, action, amount, estimated_payout, status, timestamp
-                FROM trades
-                ORDER BY timestamp DESC
-                LIMIT %s
-            """, (limit,))
-            results = cursor.fetchall()
-            cursor.close()
+            with self.db.cursor() as cursor:
+                self.db.execute_prepared(cursor, 'recent_trades', (limit,))
+                results = cursor.fetchall()
             return results
         except Exception as e:
             print(f"Error fetching trades: {e}")
@@ -88,15 +99,9 @@ class Dashboard:
     def get_signal_logs(self, limit=5):
         """Get recent signal logs"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                SELECT signal_type, rigging_index, anomaly_score, timestamp
-                FROM signal_logs
-                ORDER BY timestamp DESC
-                LIMIT %s
-            """, (limit,))
-            results = cursor.fetchall()
-            cursor.close()
+            with self.db.cursor() as cursor:
+                self.db.execute_prepared(cursor, 'recent_signal_logs', (limit,))
+                results = cursor.fetchall()
             return results
         except Exception as e:
             print(f"Error fetching signal logs: {e}")
@@ -181,7 +186,7 @@ class Dashboard:
             self.display_dashboard()
         except KeyboardInterrupt:
             print("\nDashboard stopped")
-            self.conn.close()
+            self.db.close()
             sys.exit(0)
 
 